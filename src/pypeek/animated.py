@@ -0,0 +1,176 @@
+import struct, zlib
+
+import numpy as np
+from PySide6.QtCore import QBuffer, QIODevice
+from PySide6.QtGui import QImage
+
+from .track import bgra_array
+
+ANIMATED_FORMATS = {"webp": "webp", "apng": "png"}  # formats encoded in-process, and their file extension
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def _u24(value):
+    return int(value).to_bytes(3, "little")
+
+def paeth_filter(pixels):
+    """PNG scanlines of a (h, w, channels) uint8 array, every row Paeth filtered. Encoding only looks at the raw bytes, so it's one pass over the array."""
+    height = pixels.shape[0]
+    raw = pixels.reshape(height, -1).astype(np.int16)
+    bpp = pixels.shape[2]
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    up = np.zeros_like(raw)
+    up[1:] = raw[:-1]
+    up_left = np.zeros_like(raw)
+    up_left[1:, bpp:] = raw[:-1, :-bpp]
+    p = left + up - up_left
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - up_left)
+    predicted = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+    filtered = ((raw - predicted) & 0xff).astype(np.uint8)
+    return np.hstack((np.full((height, 1), 4, np.uint8), filtered)).tobytes()
+
+def webp_chunks(data):
+    """Bitstream chunks of a still WebP file, ready to go into an animation frame."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+        raise ValueError("Not a WebP image")
+    chunks, at = [], 12
+    while at + 8 <= len(data):
+        size = struct.unpack("<I", data[at + 4:at + 8])[0]
+        end = at + 8 + size + (size & 1)
+        if data[at:at + 4] in (b"VP8 ", b"VP8L", b"ALPH"):
+            chunks.append(data[at:end])
+        at = end
+    return chunks
+
+class AnimationWriter:
+    """
+    Streams frames into an animated image file. Every frame only stores the box that changed since the previous one,
+    frames that don't change at all hold the previous one longer. Only the previous frame is kept in memory.
+    """
+    align = 1  # frame offsets have to be a multiple of it
+
+    def __init__(self, path, loop=0):
+        self.path = path
+        self.loop = loop
+        self.file = None
+        self.previous = None
+        self.pending = None  # [pixels, x, y, duration], written once the next different frame shows how long it lasts
+        self.frames = 0
+
+    def __enter__(self):
+        self.file = open(self.path, "wb")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                if self.previous is None:
+                    raise ValueError("No frames to write")
+                self.pending and self.write_frame(*self.pending)
+                self.finish()
+        finally:
+            self.file.close()
+
+    def add(self, image, duration):
+        image, pixels = bgra_array(image)
+        height, width = pixels.shape[:2]
+        if self.previous is None:
+            self.start(width, height)
+            top, left, bottom, right = 0, 0, height, width
+        else:
+            if pixels.shape != self.previous.shape:
+                raise ValueError("Frames of an animation must all have the same size")
+            changed = (pixels != self.previous).any(axis=2)
+            rows, cols = np.flatnonzero(changed.any(axis=1)), np.flatnonzero(changed.any(axis=0))
+            if not len(rows):
+                self.pending[3] += duration
+                return
+            top, left = int(rows[0]) // self.align * self.align, int(cols[0]) // self.align * self.align
+            bottom, right = int(rows[-1]) + 1, int(cols[-1]) + 1
+        self.pending and self.write_frame(*self.pending)
+        # copied, the image's pixels go away with it
+        self.pending = [pixels[top:bottom, left:right].copy(), left, top, duration]
+        self.previous = pixels.copy()
+
+    def start(self, width, height):
+        """Write the header, called with the first frame."""
+        pass
+
+    def write_frame(self, pixels, x, y, duration):
+        """Write a BGRA box of `pixels` at x, y shown for `duration` ms."""
+        pass
+
+    def finish(self):
+        """Write the trailer and patch whatever is only known at the end, the file is still open."""
+        pass
+
+class APNGWriter(AnimationWriter):
+    """Animated PNG, lossless. Changed boxes replace what's under them, nothing is blended or disposed."""
+
+    def __init__(self, path, level=6, loop=0):
+        super().__init__(path, loop)
+        self.level = level
+
+    def chunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data)))
+
+    def start(self, width, height):
+        self.file.write(PNG_SIGNATURE)
+        self.chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        # the frame count is only known at the end, it's written over this one
+        self.actl_at = self.file.tell()
+        self.chunk(b"acTL", struct.pack(">II", 0, self.loop))
+        self.sequence = 0
+
+    def write_frame(self, pixels, x, y, duration):
+        height, width = pixels.shape[:2]
+        delay = (duration, 1000) if duration < 65536 else (min(65535, round(duration / 10)), 100)
+        self.chunk(b"fcTL", struct.pack(">IIIIIHHBB", self.sequence, width, height, x, y, *delay, 0, 0))
+        data = zlib.compress(paeth_filter(pixels[..., 2::-1]), self.level)
+        if self.frames == 0:
+            self.chunk(b"IDAT", data)
+            self.sequence += 1
+        else:
+            self.chunk(b"fdAT", struct.pack(">I", self.sequence + 1) + data)
+            self.sequence += 2
+        self.frames += 1
+
+    def finish(self):
+        self.chunk(b"IEND", b"")
+        self.file.seek(self.actl_at)
+        self.chunk(b"acTL", struct.pack(">II", self.frames, self.loop))
+
+class WebPWriter(AnimationWriter):
+    """Animated WebP, every frame is encoded by Qt's WebP plugin and wrapped into an ANMF chunk. Quality 100 is lossless."""
+    align = 2
+
+    def __init__(self, path, quality=100, loop=0):
+        super().__init__(path, loop)
+        self.quality = quality
+
+    def chunk(self, kind, data):
+        self.file.write(kind + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1))
+
+    def start(self, width, height):
+        # the RIFF size is written at the end
+        self.file.write(b"RIFF\0\0\0\0WEBP")
+        self.chunk(b"VP8X", bytes((0x02, 0, 0, 0)) + _u24(width - 1) + _u24(height - 1))
+        self.chunk(b"ANIM", struct.pack("<IH", 0, self.loop))
+
+    def write_frame(self, pixels, x, y, duration):
+        height, width = pixels.shape[:2]
+        image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_RGB32)
+        buffer = QBuffer()
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        if not image.save(buffer, "webp", self.quality):
+            raise IOError("Can't encode WebP frame")
+        # no blending, the box replaces what's under it
+        header = _u24(x // 2) + _u24(y // 2) + _u24(width - 1) + _u24(height - 1) + _u24(min(duration, 0xffffff)) + bytes((0x02,))
+        self.chunk(b"ANMF", header + b"".join(webp_chunks(buffer.data().data())))
+        self.frames += 1
+
+    def finish(self):
+        size = self.file.tell()
+        self.file.seek(4)
+        self.file.write(struct.pack("<I", size - 8))
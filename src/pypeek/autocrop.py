@@ -0,0 +1,44 @@
+import logging
+
+import numpy as np
+from PySide6.QtCore import QThread, Signal, QRect
+
+logger = logging.getLogger()
+
+def change_mask(proxies, threshold=24, chunk=256):
+    """Pixels of the proxies that change anywhere in the recording, compared frame to frame a chunk at a time."""
+    mask = np.zeros(proxies.shape[1:3], bool)
+    for start in range(1, proxies.shape[0], chunk):
+        frames = proxies[start - 1:start + chunk].astype(np.int16)
+        mask |= (np.abs(np.diff(frames, axis=0)).max(axis=3) > threshold).any(axis=0)
+    return mask
+
+def change_bounds(mask, width, height, min_size=16):
+    """Bounding box of the mask scaled to a width x height frame, padded by a proxy pixel and with even sides, None if nothing changed."""
+    rows, cols = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+    if not len(rows):
+        return None
+    sx, sy = width / mask.shape[1], height / mask.shape[0]
+    x0, y0 = max(0, int((cols[0] - 1) * sx)), max(0, int((rows[0] - 1) * sy))
+    x1, y1 = min(width, int(np.ceil((cols[-1] + 2) * sx))), min(height, int(np.ceil((rows[-1] + 2) * sy)))
+    # even sides so yuv420 encoders don't have to scale
+    w, h = min(max(min_size, x1 - x0), width) // 2 * 2, min(max(min_size, y1 - y0), height) // 2 * 2
+    return QRect(max(0, min(x0, width - w)), max(0, min(y0, height - h)), w, h)
+
+class CropAnalyzer(QThread):
+    """Finds the part of the frame that changes during the recording from the proxies, emits the suggested crop in image pixels or None."""
+    crop_signal = Signal(object)
+
+    def __init__(self, proxies, width, height):
+        super().__init__()
+        self.proxies = proxies
+        self.width = width
+        self.height = height
+
+    def run(self):
+        try:
+            rect = change_bounds(change_mask(self.proxies), self.width, self.height)
+        except Exception as e:
+            logger.error(e)
+            rect = None
+        self.crop_signal.emit(rect)
@@ -0,0 +1,116 @@
+"""
+Annotation stress benchmark, runs headless with:
+
+    QT_QPA_PLATFORM=offscreen pypeek --bench 5000
+
+Fills a DrawOver scene with a mix of pen strokes, arrows, rectangles and text, then times adding
+the items, repainting the view, undo/redo and rendering the export overlay for every combination
+of the drawover.scene_index and drawover.item_cache settings.
+"""
+import os, time, random, logging, tempfile, shutil
+from math import atan2, pi
+
+from PySide6.QtWidgets import QApplication, QGraphicsPathItem, QGraphicsLineItem, QGraphicsPolygonItem, QGraphicsItemGroup, QGraphicsRectItem
+from PySide6.QtCore import QPointF
+from PySide6.QtGui import QPen, QBrush, QColor, QTransform, Qt
+
+from . import main as peek
+from .items import TextItem
+from .stroke import stroke_path
+
+KINDS = ("path", "arrow", "rect", "text")
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    QApplication.processEvents()
+    return (time.perf_counter() - start) * 1000
+
+def make_item(drawover, kind, rnd, index):
+    w, h = drawover.canvas_width, drawover.canvas_height
+    x, y = rnd.uniform(0, w), rnd.uniform(0, h)
+    pen = QPen(QColor(rnd.choice(("red", "blue", "green", "black"))), 4, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+    if kind == "path":
+        points = [QPointF(x, y)]
+        for _ in range(40):
+            points.append(points[-1] + QPointF(rnd.uniform(-12, 12), rnd.uniform(-12, 12)))
+        item = QGraphicsPathItem(stroke_path(points, drawover.pen_smoothing))
+        item.setPen(pen)
+    elif kind == "arrow":
+        end = QPointF(x + rnd.uniform(-200, 200), y + rnd.uniform(-200, 200))
+        line_item = QGraphicsLineItem(x, y, end.x(), end.y())
+        line_item.setPen(pen)
+        head = QGraphicsPolygonItem(drawover.arrow_polygon * QTransform().scale(1.6, 1.6))
+        head.setPen(pen)
+        head.setBrush(QBrush(pen.color()))
+        head.setPos(end)
+        head.setRotation(atan2(end.y() - y, end.x() - x) * 180 / pi)
+        item = QGraphicsItemGroup()
+        item.addToGroup(line_item)
+        item.addToGroup(head)
+    elif kind == "rect":
+        item = QGraphicsRectItem(x, y, rnd.uniform(20, 300), rnd.uniform(20, 200))
+        item.setPen(pen)
+    else:
+        item = TextItem(drawover.text_size, pen.color().name())
+        item.setPlainText(f"Note {index}")
+        item.setPos(x, y)
+    return item
+
+def bench_scene(drawover, count, scene_index, item_cache, seed=0, repaints=10):
+    drawover.scene_index = scene_index
+    drawover.item_cache = item_cache
+    drawover.scene.setItemIndexMethod(peek.SCENE_INDEX_METHODS[scene_index])
+    drawover.undo_history.clear_history()
+    # every item is its own undo step, all of them are timed
+    drawover.undo_history.set_limit(max(count, drawover.undo_limit))
+
+    rnd = random.Random(seed)
+    items = [make_item(drawover, KINDS[i % len(KINDS)], rnd, i) for i in range(count)]
+
+    def add():
+        for item in items:
+            drawover.scene.addItem(item)
+            drawover.add_item(item)
+
+    def repaint():
+        for _ in range(repaints):
+            drawover.view.viewport().repaint()
+
+    result = {"add": _timed(add)}
+    steps = drawover.undo_history.steps()
+    result["paint"] = _timed(repaint) / repaints
+    result["undo"] = _timed(lambda: [drawover.undo_history.undo() for _ in range(steps)])
+    result["redo"] = _timed(lambda: [drawover.undo_history.redo() for _ in range(steps)])
+    result["export"] = _timed(drawover.render_drawover)
+
+    drawover.undo_history.clear_history()
+    drawover.undo_history.set_limit(drawover.undo_limit)
+    for item in items:
+        item.scene() and drawover.scene.removeItem(item)
+    return result
+
+def run_bench(count=5000, width=1920, height=1080):
+    # keep the benchmark away from the real ~/.peek, opening a DrawOver clears the cache folder
+    peek.user_path = tempfile.mkdtemp(prefix="peek-bench-")
+    peek.app_path = os.path.abspath(os.path.dirname(peek.__file__))
+    peek.logger = logging.getLogger()
+    peek.capturer = peek.Capturer()
+    try:
+        drawover = peek.DrawOver()
+        drawover.show()
+        drawover.new_image_width, drawover.new_image_height = width, height
+        drawover.load_file(None)
+        QApplication.processEvents()
+
+        print(f"{count} items, {width}x{height} canvas, {QApplication.platformName()} platform, times in ms")
+        print(f"{'index':<8}{'cache':<8}{'add':>10}{'paint':>10}{'undo':>10}{'redo':>10}{'export':>10}")
+        for scene_index in peek.SCENE_INDEX_METHODS:
+            for item_cache in peek.ITEM_CACHE_MODES:
+                r = bench_scene(drawover, count, scene_index, item_cache)
+                print(f"{scene_index:<8}{item_cache:<8}{r['add']:>10.1f}{r['paint']:>10.1f}{r['undo']:>10.1f}{r['redo']:>10.1f}{r['export']:>10.1f}")
+        drawover.close()
+        drawover.deleteLater()
+        QApplication.processEvents()
+    finally:
+        shutil.rmtree(peek.user_path, ignore_errors=True)
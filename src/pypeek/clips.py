@@ -0,0 +1,18 @@
+import re
+
+CLIP_EXPORTS = ("join", "separate")
+
+def export_ranges(clips, first, end):
+    """[start, end) ranges that go into the export: the named clips in timeline order, or [first, end) when there are none."""
+    if not clips:
+        return [("peek", first, end)]
+    return [(name, start, stop) for name, start, stop in sorted(clips, key=lambda clip: clip[1]) if stop > start]
+
+def cut_out(frames, cutouts):
+    """Frames that aren't inside any of the [start, end) cut-outs."""
+    return [frame for frame in frames if not any(start <= frame < stop for start, stop in cutouts)]
+
+def clip_filename(index, name, ext):
+    # numbered so the files sort in timeline order, whatever the clips are called
+    name = re.sub(r"[^\w\- ]+", "_", name).strip() or "clip"
+    return f"{index + 1:02d}_{name}.{ext}"
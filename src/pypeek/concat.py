@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+from PySide6.QtCore import Qt, QDir
+from PySide6.QtGui import QImage, QPainter
+
+FIT_MODES = ("pad", "scale")
+SOURCE_PATTERNS = ["*.jpg", "*.jpeg", "*.png"]
+
+def source_files(folder):
+    """Frames of an appended recording, decoded video or image directory, in name order."""
+    names = QDir(folder).entryList(SOURCE_PATTERNS, QDir.Filter.Files, QDir.SortFlag.Name)
+    return [os.path.join(folder, name) for name in names]
+
+def resample(count, fps, target_fps):
+    """Indices of `count` frames shot at `fps` that keep their speed when played at `target_fps`, frames are held or skipped."""
+    if not fps or not target_fps or abs(fps - target_fps) < .01:
+        return np.arange(count)
+    return np.minimum(count - 1, (np.arange(max(1, round(count * target_fps / fps))) * fps / target_fps).astype(np.int64))
+
+def fit_image(image, size, fit="pad"):
+    """`image` at exactly `size`, scaled to fit between black bars or stretched over it."""
+    if image.size() == size:
+        return image
+    if fit == "scale":
+        return image.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    scaled = image.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    canvas = QImage(size, QImage.Format.Format_RGB32)
+    canvas.fill(Qt.GlobalColor.black)
+    painter = QPainter(canvas)
+    painter.drawImage((size.width() - scaled.width()) // 2, (size.height() - scaled.height()) // 2, scaled)
+    painter.end()
+    return canvas
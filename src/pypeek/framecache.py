@@ -0,0 +1,116 @@
+import threading, math
+from collections import OrderedDict
+
+from PySide6.QtCore import QRunnable, QThreadPool, QSize
+from PySide6.QtGui import QImageReader
+
+def read_frame(path, scale=1):
+    """Decode a frame from disk, optionally downscaled by the decoder itself. Safe to call from any thread."""
+    reader = QImageReader(path)
+    if scale != 1:
+        size = reader.size()
+        reader.setScaledSize(QSize(math.ceil(size.width() * scale), math.ceil(size.height() * scale)))
+    image = reader.read()
+    if image.isNull():
+        return None
+    return image
+
+class FrameCache:
+    """Memory bounded LRU of decoded frames, shared by the GUI thread and prefetch workers."""
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self._bytes -= old.sizeInBytes()
+            self._images[key] = image
+            self._bytes += image.sizeInBytes()
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= evicted.sizeInBytes()
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._images
+
+    def load(self, path, scale=1):
+        """Return the cached frame or decode it synchronously on a miss."""
+        image = self.get((path, scale))
+        if image is None:
+            image = read_frame(path, scale)
+            image is not None and self.put((path, scale), image)
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "frames": len(self._images),
+                "bytes": self._bytes,
+            }
+
+class _PrefetchTask(QRunnable):
+    def __init__(self, prefetcher, path, scale, generation):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.path = path
+        self.scale = scale
+        self.generation = generation
+
+    def run(self):
+        # playhead jumped since this task was queued, the frame is not needed anymore
+        if self.generation != self.prefetcher.generation:
+            return
+        image = read_frame(self.path, self.scale)
+        image is not None and self.prefetcher.cache.put((self.path, self.scale), image)
+
+class FramePrefetcher:
+    """Decodes frames ahead of the playhead on a thread pool."""
+
+    def __init__(self, cache, depth=8, max_threads=None):
+        self.cache = cache
+        self.depth = depth
+        self.generation = 0
+        self.pool = QThreadPool()
+        max_threads and self.pool.setMaxThreadCount(max_threads)
+
+    def prefetch(self, paths, scale=1):
+        """Queue the given paths, ordered by how soon they will be shown, replacing any earlier request."""
+        self.generation += 1
+        self.pool.clear()
+        for path in paths[:self.depth]:
+            if not self.cache.contains((path, scale)):
+                self.pool.start(_PrefetchTask(self, path, scale, self.generation))
+
+    def stop(self):
+        self.generation += 1
+        self.pool.clear()
+        self.pool.waitForDone()
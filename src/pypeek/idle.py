@@ -0,0 +1,67 @@
+import logging
+
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+from .track import bgra_array
+
+logger = logging.getLogger()
+
+IDLE_MODES = ("speed", "hold")
+
+def change_energy(proxies, threshold=24, chunk=256):
+    """Fraction of proxy pixels that changed since the previous frame, 0 for the first frame."""
+    energy = np.zeros(proxies.shape[0], np.float32)
+    for start in range(1, proxies.shape[0], chunk):
+        frames = proxies[start - 1:start + chunk].astype(np.int16)
+        energy[start:start + chunk] = (np.abs(np.diff(frames, axis=0)).max(axis=3) > threshold).mean(axis=(1, 2))
+    return energy
+
+def timeline_energy(energy, frames):
+    """Change energy of the store frames in timeline order, held copies don't change, jumps in the store always do."""
+    timeline = energy[frames]
+    timeline[1:][frames[1:] != frames[:-1] + 1] = 1.0
+    timeline[1:][frames[1:] == frames[:-1]] = 0.0
+    return timeline
+
+def idle_spans(energy, threshold, min_frames):
+    """[start, stop) runs of at least `min_frames` frames whose change energy stays under `threshold`."""
+    idle = np.concatenate(([False], energy < threshold, [False]))
+    edges = np.flatnonzero(np.diff(idle.astype(np.int8)))
+    return [(int(start), int(stop)) for start, stop in zip(edges[::2], edges[1::2]) if stop - start >= min_frames]
+
+def keep_frames(first, end, spans=(), mode="speed", speed=8, hold=8, timelapse=1):
+    """Frames of [first, end) left after idle spans are sped up or cut to a short hold, then every `timelapse`th one."""
+    keep = np.ones(max(0, end - first), bool)
+    for start, stop in spans:
+        span = keep[max(start, first) - first:max(min(stop, end) - first, 0)]
+        if mode == "hold":
+            span[hold:] = False
+        else:
+            span[:] = False
+            span[::max(1, speed)] = True
+    return (np.flatnonzero(keep) + first)[::max(1, timelapse)].tolist()
+
+def frame_signature(image, step=4):
+    """Every `step`th pixel of a captured frame, enough to notice anything changing on screen."""
+    _, pixels = bgra_array(image)
+    return pixels[::step, ::step, :3].astype(np.int16)
+
+def frames_differ(a, b, threshold=24):
+    return a is None or b is None or a.shape != b.shape or bool((np.abs(a - b) > threshold).any())
+
+class IdleAnalyzer(QThread):
+    """Computes the change energy of every frame from the proxies, emits the array or None."""
+    energy_signal = Signal(object)
+
+    def __init__(self, proxies):
+        super().__init__()
+        self.proxies = proxies
+
+    def run(self):
+        try:
+            energy = change_energy(self.proxies)
+        except Exception as e:
+            logger.error(e)
+            energy = None
+        self.energy_signal.emit(energy)
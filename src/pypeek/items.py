@@ -0,0 +1,144 @@
+from bisect import bisect_left
+
+from PySide6.QtWidgets import QGraphicsTextItem, QGraphicsRectItem, QGraphicsItem, QStyle
+from PySide6.QtCore import Qt, QRectF, QPointF
+from PySide6.QtGui import QColor, QPen
+
+from .redact import redacted_tile
+
+FRAME_RANGE = 0  # item data key, [first, last] frames the annotation is shown on, None for every frame
+
+def frame_range(item):
+    return item.data(FRAME_RANGE)
+
+def set_frame_range(item, first_last):
+    item.setData(FRAME_RANGE, list(first_last) if first_last else None)
+
+def is_active(item, frame):
+    first_last = item.data(FRAME_RANGE)
+    return first_last is None or first_last[0] <= frame <= first_last[1]
+
+def overlay_runs(items, first, end):
+    """Split frames [first, end) into runs that show the same items, returns (items, first, end) for every run with items on it."""
+    cuts = {first, end}
+    for item in items:
+        first_last = item.data(FRAME_RANGE)
+        if first_last:
+            cuts.update(frame for frame in (first_last[0], first_last[1] + 1) if first < frame < end)
+
+    runs = []
+    cuts = sorted(cuts)
+    for start, stop in zip(cuts, cuts[1:]):
+        active = tuple(item for item in items if is_active(item, start))
+        if runs and runs[-1][0] == active and runs[-1][2] == start:
+            runs[-1][2] = stop
+        elif active:
+            runs.append([active, start, stop])
+    return [tuple(run) for run in runs]
+
+class TextItem(QGraphicsTextItem):
+    """Editable text annotation drawn on a translucent white box, cached at its own bounding rect size."""
+
+    def __init__(self, text_size=13, text_color="black", parent=None):
+        super().__init__(parent)
+        self.background = QColor(255, 255, 255, 204)
+        font = self.font()
+        font.setPointSize(text_size)
+        self.setFont(font)
+        self.setDefaultTextColor(QColor(text_color))
+        self.document().setDocumentMargin(2 + 4 * text_size / 10)
+        self.document().setUndoRedoEnabled(False)
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+
+    def is_editing(self):
+        return self.textInteractionFlags() != Qt.TextInteractionFlag.NoTextInteraction
+
+    def start_editing(self):
+        self.setTextInteractionFlags(Qt.TextInteractionFlag.TextEditorInteraction)
+        self.setFocus(Qt.FocusReason.MouseFocusReason)
+
+    def stop_editing(self):
+        cursor = self.textCursor()
+        cursor.clearSelection()
+        self.setTextCursor(cursor)
+        self.setTextInteractionFlags(Qt.TextInteractionFlag.NoTextInteraction)
+
+    def paint(self, painter, option, widget=None):
+        painter.fillRect(self.boundingRect(), self.background)
+        # no dashed focus frame, the item renders the same while editing and on export
+        option.state &= ~(QStyle.StateFlag.State_HasFocus | QStyle.StateFlag.State_Selected)
+        super().paint(painter, option, widget)
+
+    def focusOutEvent(self, event):
+        super().focusOutEvent(event)
+        self.stop_editing()
+
+    def mousePressEvent(self, event):
+        if not self.is_editing():
+            self.start_editing()
+        super().mousePressEvent(event)
+        event.accept()
+
+class RedactItem(QGraphicsRectItem):
+    """Blurred or pixelated region, previewed from the background pixmap and applied to the frames on export."""
+
+    def __init__(self, rect=QRectF(), mode="pixelate", strength=12, parent=None):
+        super().__init__(rect, parent)
+        self.mode = mode
+        self.strength = strength
+        pen = QPen(QColor(255, 255, 255, 160), 1, Qt.PenStyle.DashLine)
+        pen.setCosmetic(True)
+        self.setPen(pen)
+        # (background pixmap item, its pixels per image pixel, key of what it shows, whether the frames are scrubbed), set by the editor
+        self.background = lambda: (None, 1, None, False)
+        self._tile = None
+        self._tile_key = None
+        self.keyframes = {}  # frame -> (x, y) position of a tracked region
+        self._keyframe_frames = []
+
+    def set_keyframes(self, keyframes):
+        self.keyframes = keyframes
+        self._keyframe_frames = sorted(keyframes)
+
+    def offset_at(self, frame):
+        """Position on `frame`, interpolated between keyframes and held before the first and after the last one."""
+        frames = self._keyframe_frames
+        if not frames:
+            return self.pos()
+        i = bisect_left(frames, frame)
+        if i < len(frames) and frames[i] == frame:
+            return QPointF(*self.keyframes[frame])
+        if i == 0 or i == len(frames):
+            return QPointF(*self.keyframes[frames[min(i, len(frames) - 1)]])
+        (f0, (x0, y0)), (f1, (x1, y1)) = (frames[i - 1], self.keyframes[frames[i - 1]]), (frames[i], self.keyframes[frames[i]])
+        t = (frame - f0) / (f1 - f0)
+        return QPointF(x0 + (x1 - x0) * t, y0 + (y1 - y0) * t)
+
+    def image_rect(self, scale, frame=None):
+        """Region in image pixels on `frame`, or where it is shown now. `scale` is image pixels per scene unit."""
+        rect = self.mapRectToScene(self.rect()) if frame is None else self.rect().translated(self.offset_at(frame))
+        return QRectF(rect.topLeft() * scale, rect.size() * scale).toAlignedRect()
+
+    def update_tile(self):
+        bg_item, pixels_per_image_pixel, bg_key, scrubbing = self.background()
+        pixmap = bg_item.pixmap() if bg_item else None
+        if not pixmap or pixmap.isNull():
+            self._tile = None
+            return
+        # the last tile is shown while the slider is dragged, it's redone for the frame the drag stops on
+        if scrubbing and self._tile is not None:
+            return
+        source = bg_item.mapRectFromScene(self.mapRectToScene(self.rect())).toAlignedRect() & pixmap.rect()
+        key = (bg_key, pixmap.width(), source.getRect(), self.mode, self.strength)
+        if key == self._tile_key:
+            return
+        # only the covered part of the frame is converted and redacted
+        self._tile_key = key
+        self._tile = (redacted_tile(pixmap.copy(source).toImage(), source.translated(-source.topLeft()), self.mode, max(1, round(self.strength * pixels_per_image_pixel))),
+                      self.mapRectFromScene(bg_item.mapRectToScene(QRectF(source))))
+
+    def paint(self, painter, option, widget=None):
+        self.update_tile()
+        if self._tile and not self._tile[0].isNull():
+            painter.drawImage(self._tile[1], self._tile[0])
+        super().paint(painter, option, widget)
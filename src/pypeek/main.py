@@ -1,9 +1,29 @@
-import os, shutil, time, subprocess, configparser, sys, requests, math, logging, tempfile
+import os, re, shutil, time, subprocess, configparser, sys, requests, math, logging, tempfile, threading, json, itertools, hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from math import atan2, pi
+from bisect import bisect_right
+import numpy as np
 from .shortcut import create_shortcut
 from .ffmpeg import get_ffmpeg
-from .undo import Undo, ClearSceneCmd, AddSceneItemCmd
-from .qrangeslider import QRangeSlider
+from .undo import Undo, ClearSceneCmd, AddSceneItemCmd, SetFrameRangeCmd, SetKeyframesCmd, EditFramesCmd
+from .qrangeslider import QRangeSlider, QMarkerSlider
+from .framecache import FrameCache, FramePrefetcher
+from .proxy import ProxyBuilder, load_proxies, proxy_image, filmstrip_image
+from .playback import PlaybackClock
+from .items import TextItem, RedactItem, frame_range, set_frame_range, is_active, overlay_runs
+from .redact import redact_image, REDACT_MODES
+from .track import RegionTracker
+from .autocrop import CropAnalyzer
+from .sceneindex import SceneIndexer, load_index, scene_cuts
+from .idle import IdleAnalyzer, IDLE_MODES, idle_spans, timeline_energy, keep_frames, frame_signature, frames_differ
+from .manifest import FrameManifest, first_positions, remap_range
+from .concat import FIT_MODES, source_files, resample, fit_image
+from .clips import CLIP_EXPORTS, export_ranges, cut_out, clip_filename
+from .spritesheet import SpriteSheet, SPRITE_FORMATS
+from .animated import ANIMATED_FORMATS, APNGWriter, WebPWriter
+from .stroke import simplify, stroke_path
+from .project import Project, load_project, item_from_dict, PROJECT_EXT
 
 from PySide6.QtWidgets import *
 from PySide6.QtCore import *
@@ -12,6 +32,10 @@ from PySide6.QtGui import *
 user_path, app_path, logger, capturer = None, None, None, None
 __version__ = '2.10.11'
 
+# drawover.scene_index and drawover.item_cache settings, see `pypeek --bench` to pick them for a workload
+SCENE_INDEX_METHODS = {"bsp": QGraphicsScene.ItemIndexMethod.BspTreeIndex, "none": QGraphicsScene.ItemIndexMethod.NoIndex}
+ITEM_CACHE_MODES = {"device": QGraphicsItem.CacheMode.DeviceCoordinateCache, "item": QGraphicsItem.CacheMode.ItemCoordinateCache, "none": QGraphicsItem.CacheMode.NoCache}
+
 def init():
     global user_path, app_path, logger, capturer
     if user_path is not None:
@@ -37,8 +61,7 @@ def init():
             if input("Ffmpeg not found, download? (y/n): ").lower() == "y":
                 get_ffmpeg()
             else:
-                print("Please install ffmpeg and add it to your PATH. Exiting...")
-                sys.exit()
+                print("Ffmpeg not found, videos can only be saved as animated WebP or APNG.")
 
         # add local ffmpeg to path in case its local
         os.environ["PATH"] = os.pathsep.join([ffmpeg_local, os.environ["PATH"]])
@@ -195,6 +218,26 @@ class PyPeek(QMainWindow):
         self.menu.addAction(action2)
         self.menu.addSeparator()
 
+        # encoded in-process, the only formats left without ffmpeg
+        action4 = QWidgetAction(self.menu)
+        action4.setActionGroup(group)
+        self.webp_radio = QRadioButton("webp")
+        self.webp_radio.setFixedHeight(25)
+        action4.setDefaultWidget(self.webp_radio)
+        self.menu.addAction(action4)
+        self.menu.addSeparator()
+
+        action5 = QWidgetAction(self.menu)
+        action5.setActionGroup(group)
+        self.apng_radio = QRadioButton("apng")
+        self.apng_radio.setFixedHeight(25)
+        action5.setDefaultWidget(self.apng_radio)
+        self.menu.addAction(action5)
+        self.menu.addSeparator()
+
+        self.gif_radio.setEnabled(capturer.has_ffmpeg())
+        self.mp4_radio.setEnabled(capturer.has_ffmpeg())
+
         # action3 = QWidgetAction(self.menu)
         # action3.setActionGroup(group)
         # self.webm_radio = QRadioButton("webm")
@@ -207,6 +250,8 @@ class PyPeek(QMainWindow):
 
         self.gif_radio.toggled.connect(self.update_record_format)
         self.mp4_radio.toggled.connect(self.update_record_format)
+        self.webp_radio.toggled.connect(self.update_record_format)
+        self.apng_radio.toggled.connect(self.update_record_format)
         # self.webm_radio.toggled.connect(self.update_record_format)
 
         # set checked radio button
@@ -214,6 +259,10 @@ class PyPeek(QMainWindow):
             self.gif_radio.setChecked(True)
         elif capturer.v_ext == "mp4":
             self.mp4_radio.setChecked(True)
+        elif capturer.v_ext == "webp":
+            self.webp_radio.setChecked(True)
+        elif capturer.v_ext == "apng":
+            self.apng_radio.setChecked(True)
         elif capturer.v_ext == "webm":
             self.webm_radio.setChecked(True)
 
@@ -291,6 +340,7 @@ class PyPeek(QMainWindow):
         self.quality_widget = PyPeek.create_row_widget("Capture Quality", "Set the quality of the capture", PyPeek.create_radio_button({"md":"Medium", "hi":"High"}, capturer.quality, self.set_quality))
         self.delay_widget = PyPeek.create_row_widget("Delay Start", "Set the delay before the recording starts", PyPeek.create_spinbox(capturer.delay, 0, 10, self.set_delay_start ))
         self.duration_widget = PyPeek.create_row_widget("Recording Limit", "Stop recording after a given time in seconds (0 = unlimited)", PyPeek.create_spinbox(capturer.duration, 0, 600, self.set_duration ))
+        self.auto_pause_widget = PyPeek.create_row_widget("Auto Pause", "Stop writing frames after nothing changes for a given time in seconds (0 = never)", PyPeek.create_spinbox(capturer.auto_pause, 0, 600, self.set_auto_pause ))
         self.update_widget = PyPeek.create_row_widget("Check For Updates", "Check for updates on startup", PyPeek.create_checkbox("", self.check_update_on_startup, self.set_check_update_on_startup))
         self.reset_widget = PyPeek.create_row_widget("Reset And Restart", "Reset all settings and restart the app", PyPeek.create_button("Reset Settings", callback = self.reset_settings))
         self.copyright_widget = PyPeek.create_row_widget("About", f"Peek {__version__} - Cross platform screen recorder", PyPeek.create_hyperlink("Website", "https://github.com/firatkiral/pypeek/wiki"))
@@ -312,6 +362,8 @@ class PyPeek(QMainWindow):
         self.settings_layout.addWidget(PyPeek.create_h_divider())
         self.settings_layout.addWidget(self.duration_widget)
         self.settings_layout.addWidget(PyPeek.create_h_divider())
+        self.settings_layout.addWidget(self.auto_pause_widget)
+        self.settings_layout.addWidget(PyPeek.create_h_divider())
         # self.settings_layout.addWidget(self.update_widget)
         # self.settings_layout.addWidget(PyPeek.create_h_divider())
         self.settings_layout.addWidget(self.reset_widget)
@@ -393,11 +445,13 @@ class PyPeek(QMainWindow):
         capturer.show_cursor = config.getboolean('capture', 'show_cursor', fallback=True)
         capturer.fullscreen = config.getboolean('capture', 'fullscreen', fallback=True)
         capturer.v_ext = config.get('capture', 'v_ext', fallback='gif')
+        capturer.v_ext = capturer.v_ext if capturer.v_ext in ANIMATED_FORMATS or capturer.has_ffmpeg() else 'webp'
         capturer.fps = capturer.true_fps = config.getint('capture', 'fps', fallback=15)
         capturer.i_ext = config.get('capture', 'img_format', fallback='jpg')
         capturer.quality = config.get('capture', 'quality', fallback='hi')
         capturer.delay = config.getint('capture', 'delay', fallback=3)
         capturer.duration = config.getint('capture', 'duration', fallback=0)
+        capturer.auto_pause = config.getint('capture', 'auto_pause', fallback=0)
         self.minimize_to_tray = config.getboolean('capture', 'minimize_to_tray', fallback=False)
         self.record_width = config.getint('capture', 'width', fallback=506)
         self.record_height = config.getint('capture', 'height', fallback=406)
@@ -420,6 +474,7 @@ class PyPeek(QMainWindow):
             'quality': capturer.quality,
             'delay': str(capturer.delay),
             'duration': str(capturer.duration),
+            'auto_pause': str(capturer.auto_pause),
             'minimize_to_tray': str(self.minimize_to_tray),
             'width': str(self.record_width),
             'height': str(self.record_height),
@@ -475,6 +530,10 @@ class PyPeek(QMainWindow):
             capturer.v_ext = "gif"
         elif self.mp4_radio.isChecked():
             capturer.v_ext = "mp4"
+        elif self.webp_radio.isChecked():
+            capturer.v_ext = "webp"
+        elif self.apng_radio.isChecked():
+            capturer.v_ext = "apng"
         elif self.webm_radio.isChecked():
             capturer.v_ext = "webm"
         self.record_button.setText(f"{capturer.v_ext.upper()}")
@@ -561,11 +620,11 @@ class PyPeek(QMainWindow):
         self.prepare_capture_ui()
         capturer.screenshot()
     
-    def screenshot_done(self, filepath):
+    def screenshot_done(self, image, filepath):
         self.hide()
         self.tray_icon.hide()
         self.drawover.show()
-        self.drawover.load_file(filepath)
+        self.drawover.load_file(filepath, image)
             
     def record(self):
         self.prepare_capture_ui()
@@ -650,6 +709,9 @@ class PyPeek(QMainWindow):
     
     def set_duration(self, value):
         capturer.duration = value
+
+    def set_auto_pause(self, value):
+        capturer.auto_pause = value
     
     def set_check_update_on_startup(self, value):
         self.check_update_on_startup = value
@@ -901,10 +963,48 @@ class DrawOver(QMainWindow):
 
         self.is_sequence = False
         self.image_filenames = None
+        self.sources = [] # folders of appended recordings, decoded videos and image directories
+        self.all_sources = [] # sources including undone appends, frame states only keep how many are in use
+        self.frame_files = [] # paths of the recorded frames, then of every appended source's
+        self.manifest = FrameManifest.identity(0) # timeline frames as indices into frame_files
+        self.pending_append = None
+        self.concat_fit = "pad"
+        self.sprite_trim = False
+        self.frame_clipboard = None
+        self.hold_seconds = 1.0
         self.frame_count = 0
-        self.duration = 0
+        self.current_frame = 0
+        self.frame_cache_mb = 512
+        self.prefetch_depth = 8
+        self.proxies = None
+        self.proxy_builder = None
+        self.proxy_width = 160
+        self.tracker = None
+        self.tracked_item = None
+        self.pauses = []
+        self.scene_indexer = None
+        self.scene_hashes = None
+        self.scene_cuts = []
+        self.scene_cut_distance = 10
+        self.crop_analyzer = None
+        self.crop_suggestion = None
+        self.crop_rect = None
+        self.idle_analyzer = None
+        self.idle_energy = None
+        self.idle_spans = []
+        self.compress_idle = False
+        self.idle_mode = "speed"
+        self.idle_seconds = 2.0
+        self.idle_threshold = 0.002
+        self.idle_speed = 8
+        self.idle_hold = 0.5
+        self.timelapse = 1
+        self.clips = [] # [name, start, end] ranges exported instead of the trimmed range
+        self.cutouts = [] # [start, end] ranges left out of the export
+        self.clip_export = "join"
 
         self.image_path = image_path
+        self.bg_image = None
 
         # Variables
         self.current_tool = "select"
@@ -916,23 +1016,52 @@ class DrawOver(QMainWindow):
         self.text_color = "black"
         self.text_size = 13
         self.filled = False
+        self.redact_mode = "pixelate"
+        self.redact_strength = 12
+        self.pen_tolerance = 0.5
+        self.pen_smoothing = False
+        self.stroke_chunk_size = 64
+        self.scene_index = "bsp"
+        self.item_cache = "device"
+        self.undo_limit = 500
+        self.undo_memory_mb = 256
+        self.undo_merge_ms = 300
+        self.project = None
+        self.max_projects = 20
 
         self.load_settings()
 
+        # Decoded frames for playback and scrubbing
+        self.frame_cache = FrameCache(self.frame_cache_mb * 1024 * 1024)
+        self.frame_prefetcher = FramePrefetcher(self.frame_cache, self.prefetch_depth)
+
         # Undo/Redo
-        self.undo_history = Undo()
+        self.undo_history = Undo(self.undo_limit, self.undo_memory_mb * 1024 * 1024, self.undo_merge_ms / 1000)
         undo_shortcut = QShortcut(QKeySequence('Ctrl+Z'), self)
         redo_shortcut = QShortcut(QKeySequence('Shift+Ctrl+Z'), self)
         undo_shortcut.activated.connect(self.undo_history.undo)
         redo_shortcut.activated.connect(self.undo_history.redo)
+        next_marker_shortcut = QShortcut(QKeySequence('Ctrl+Right'), self)
+        prev_marker_shortcut = QShortcut(QKeySequence('Ctrl+Left'), self)
+        next_marker_shortcut.activated.connect(lambda: self.jump_to_marker(1))
+        prev_marker_shortcut.activated.connect(lambda: self.jump_to_marker(-1))
+
+        # Project autosave, coalesces bursts of edits into one write
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(500)
+        self.autosave_timer.timeout.connect(self.save_project)
+        self.undo_history.on_change = self.schedule_autosave
 
         self.dragging = False
         self.current_text_item = None
+        self.current_redact_item = None
         self.slider = None
         self.current_pen = QPen(QColor(self.pen_color), self.pen_width, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
         self.current_brush = QBrush(QColor(self.pen_color))
 
         self.items = []
+        self.item_transitions = None # frames where annotations appear or disappear, see update_item_ranges
         self.arrow_polygon = QPolygonF([QPointF(2, 0), QPointF(-10, 5), QPointF(-10, -5)])
         
         # Toolbar
@@ -942,33 +1071,27 @@ class DrawOver(QMainWindow):
         self.canvas_width = self.image_width
         self.canvas_height = self.image_height
 
-        self.bg_image = self.create_bg_image_widget()
-        self.canvas = self.create_canvas()
-        self.text_widget = QWidget()
-        self.text_widget.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
-
-        canvas_layout = QStackedLayout()
-        canvas_layout.setStackingMode(QStackedLayout.StackingMode.StackAll)
-        canvas_layout.addWidget(self.bg_image)
-        canvas_layout.addWidget(self.canvas)
-        canvas_layout.addWidget(self.text_widget)
-
-        self.canvas_widget = QWidget()
-        self.canvas_widget.setLayout(canvas_layout)
-        self.canvas_widget.resize(self.canvas_width, self.canvas_height)
-
         self.scene = QGraphicsScene(self)
-        self.scene.addWidget(self.canvas_widget)
+        self.scene.setItemIndexMethod(SCENE_INDEX_METHODS[self.scene_index])
+        self.bg_item = self.create_bg_item()
+        self.bg_key = None
+        self.scene.addItem(self.bg_item)
+        self.crop_item = self.create_crop_item()
+        self.scene.addItem(self.crop_item)
         self.view = QGraphicsView(self.scene)
         self.view.setStyleSheet("QGraphicsView {background-color: #333; color: #fff;}")
         self.view.setRenderHint(QPainter.RenderHint.Antialiasing)
         self.view.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
         self.view.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         self.view.viewport().setAttribute(Qt.WidgetAttribute.WA_AcceptTouchEvents)
+        # only repaint the area that changed, the background is an item so there is nothing to cache behind it
+        self.view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.view.setCacheMode(QGraphicsView.CacheModeFlag.CacheNone)
+        self.view.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, True)
 
-        self.canvas.mousePressEvent = self._mousePressEvent
-        self.canvas.mouseMoveEvent = self._mouseMoveEvent
-        self.canvas.mouseReleaseEvent = self._mouseReleaseEvent
+        self.scene.mousePressEvent = self._mousePressEvent
+        self.scene.mouseMoveEvent = self._mouseMoveEvent
+        self.scene.mouseReleaseEvent = self._mouseReleaseEvent
 
 
         # QShortcut(
@@ -997,7 +1120,7 @@ class DrawOver(QMainWindow):
         new_button.clicked.connect(self.new_file)
         save_button = DrawOver.create_button("Save", "", "#0d6efd", "#0b5ed7", "#0a58ca")
         save_button.setFixedWidth(100)
-        save_button.clicked.connect(self.save_file)
+        save_button.clicked.connect(lambda: self.save_file())
         close_button = DrawOver.create_button("Close")
         close_button.setFixedWidth(100)
         close_button.clicked.connect(self.close)
@@ -1008,7 +1131,7 @@ class DrawOver(QMainWindow):
         not self._parent and save_layout.addWidget(new_button)
         save_layout.addStretch(1)
         save_layout.addWidget(close_button)
-        save_layout.addWidget(save_button)
+        save_layout.addWidget(PyPeek.make_group_button(save_button, self.create_export_button()))
 
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(0,0,0,0)
@@ -1053,6 +1176,7 @@ class DrawOver(QMainWindow):
 
         tr = self.view.transform() * scale_tr
         self.view.setTransform(tr)
+        self.refresh_bg_image()
 
     def zoom_out(self):
         scale_tr = QTransform()
@@ -1060,9 +1184,11 @@ class DrawOver(QMainWindow):
 
         tr = self.view.transform() * scale_tr
         self.view.setTransform(tr)
+        self.refresh_bg_image()
     
     def reset_zoom(self):
         self.view.resetTransform()
+        self.refresh_bg_image()
     
     def clear_canvas(self):
         self.undo_history.push(ClearSceneCmd(self))
@@ -1170,6 +1296,16 @@ class DrawOver(QMainWindow):
         self.text_tool.triggered.connect(lambda: self.set_tool("text"))
         toolbar.addAction(self.text_tool)
 
+        self.redact_tool = self.create_redact_tool()
+        self.redact_tool.setToolTip("Redact Tool")
+        self.redact_tool.setCheckable(True)
+        tool_button_group.addAction(self.redact_tool)
+        self.redact_tool.triggered.connect(lambda: self.set_tool("redact"))
+        toolbar.addAction(self.redact_tool)
+        redact_tool_button = toolbar.widgetForAction(self.redact_tool)
+        redact_tool_button.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        redact_tool_button.setStyleSheet("QToolButton::menu-button { background-color: transparent; color: #aaa;}" )
+
         self.clear_tool = QAction(QIcon(f"{app_path}/icon/broom.png"), "", self)
         self.clear_tool.setToolTip("Clear Canvas")
         toolbar.addAction(self.clear_tool)
@@ -1220,69 +1356,478 @@ class DrawOver(QMainWindow):
 
         return toolbar
     
-    def create_bg_image_widget(self):
-        bg_image = QLabel()
-        bg_image.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        bg_image.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+    def create_bg_item(self):
+        bg_item = QGraphicsPixmapItem()
+        bg_item.setZValue(-1)
+        bg_item.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
+        bg_item.setShapeMode(QGraphicsPixmapItem.ShapeMode.BoundingRectShape)
+        bg_item.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+
+        return bg_item
+
+    def create_crop_item(self):
+        # dims everything outside the crop, it is not an annotation and never exported
+        crop_item = QGraphicsPathItem()
+        crop_item.setZValue(1000)
+        crop_item.setPen(Qt.PenStyle.NoPen)
+        crop_item.setBrush(QColor(0, 0, 0, 150))
+        crop_item.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        crop_item.hide()
+
+        return crop_item
+
+    def set_bg_pixmap(self, pixmap, key=None):
+        self.bg_pixmap = pixmap
+        # what the pixmap shows, redactions keep their tile while it stays the same
+        self.bg_key = pixmap.cacheKey() if key is None else key
+        self.bg_item.setPixmap(pixmap)
+        # reduced resolution frames and proxies are stretched to the canvas
+        self.bg_item.setScale(self.canvas_width / pixmap.width() if pixmap.width() and self.canvas_width else 1)
+
+    def frame_path(self, frame):
+        return self.frame_files[self.manifest[frame]]
+
+    def update_frame_files(self):
+        self.frame_files = [os.path.join(self.image_dir, filename) for filename in self.image_filenames] + [path for folder in self.sources for path in source_files(folder)]
+
+    def decode_scale(self):
+        # full resolution unless frames are changing fast while the view is zoomed out
+        interactive = self.playback.is_running() or self.slider.isSliderDown()
+        view_scale = self.view.transform().m11() * self.view.devicePixelRatioF()
+        if not interactive or view_scale >= 1:
+            return 1
+
+        # jpeg decoder scales natively by 1/2, 1/4 and 1/8, stay on those steps so cached frames are reused across zoom levels
+        scale = 1
+        while scale > 1/8 and scale / 2 >= view_scale:
+            scale /= 2
+        return scale
+
+    def update_bg_image(self, frame):
+        self.step_item_ranges(frame)
+        # proxies while dragging, full frame is loaded once the drag stops
+        if self.proxies is not None and self.slider.isSliderDown():
+            self.current_frame = frame
+            self.set_bg_pixmap(QPixmap.fromImage(proxy_image(self.proxies, self.manifest[frame])), self.frame_path(frame))
+            return
 
-        return bg_image
+        scale = self.decode_scale()
+        image = self.frame_cache.load(self.frame_path(frame), scale)
+        if image is None:
+            return
+        size = QSize(math.ceil(self.image_width * scale), math.ceil(self.image_height * scale))
+        if self.sources and image.size() != size:
+            # appended frames of another size are fitted to the canvas once and cached that way
+            image = fit_image(image, size, self.concat_fit)
+            self.frame_cache.put((self.frame_path(frame), scale), image)
+        self.set_bg_pixmap(QPixmap.fromImage(image), self.frame_path(frame))
+
+        # decode ahead of the playhead in the direction of play
+        direction = -1 if frame < self.current_frame else 1
+        self.current_frame = frame
+        end = self.slider.maximum() + 1 if direction > 0 else self.slider.minimum() - 1
+        ahead = range(frame + direction, end, direction)[:self.frame_prefetcher.depth]
+        self.frame_prefetcher.prefetch([self.frame_path(i) for i in ahead], scale)
+
+    def frame_ready(self, frame):
+        return self.frame_cache.contains((self.frame_path(frame), self.decode_scale()))
+
+    def refresh_bg_image(self):
+        self.is_sequence and self.update_bg_image(self.slider.value())
+
+    def update_markers(self):
+        # scene changes in white, auto pauses of the recording in orange, the frame before a pause marker was held on screen
+        markers = [(frame, "#ffffff") for frame in self.scene_cuts] + [(frame, "#e0a030") for frame in self.manifest.positions([frame for frame, _ in self.pauses])]
+        self.range_slider.setMarkers(markers)
+        self.slider.setMarkers(markers)
+
+    def jump_to_marker(self, direction):
+        if not self.is_sequence:
+            return
+        frames = sorted({frame for frame, _ in self.slider.markers()} | {self.slider.minimum(), self.slider.maximum()})
+        current = self.slider.value()
+        target = next((frame for frame in frames if frame > current), current) if direction > 0 else next((frame for frame in reversed(frames) if frame < current), current)
+        self.slider.setValue(target)
+
+    def derived_path(self, name):
+        """Where proxies and the scene index of the frames are kept. Recordings and project frames are ours and keep them in their folder,
+        frames opened from the user's folders get a folder in the cache, keyed by their path."""
+        image_dir = os.path.abspath(self.image_dir)
+        if any(image_dir.startswith(os.path.abspath(folder) + os.sep) for folder in (capturer.cache_dir, self.projects_dir())):
+            return os.path.join(self.image_dir, name)
+        folder = os.path.join(capturer.cache_dir, "derived", hashlib.sha1(image_dir.encode()).hexdigest()[:16])
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, name)
+
+    def index_scenes(self):
+        self.scene_indexer and self.scene_indexer.stop()
+        self.scene_indexer = SceneIndexer(self.proxies, self.derived_path("dhash.npy"), self.derived_path("proxy.npy"))
+        self.scene_indexer.index_done_signal.connect(self.scenes_indexed)
+        self.scene_indexer.start()
+
+    def scenes_indexed(self, index_path):
+        if not self.is_sequence or index_path != self.derived_path("dhash.npy"):
+            return
+        self.scene_hashes = load_index(index_path, len(self.frame_files))
+        self.update_frame_views()
+
+    def update_frame_views(self):
+        # the filmstrip, scene cuts and idle spans come from the frame store, they follow the manifest
+        frames = self.manifest.frames
+        # results of an analysis that started before frames were appended don't cover them
+        complete = lambda values: values is not None and len(values) == len(self.frame_files)
+        self.range_slider.setFilmstrip(QPixmap.fromImage(filmstrip_image(self.proxies, 24, frames)) if complete(self.proxies) and len(frames) else None)
+        self.scene_cuts = scene_cuts(self.scene_hashes[frames], self.scene_cut_distance) if complete(self.scene_hashes) else []
+        self.idle_spans = [] if not complete(self.idle_energy) else idle_spans(timeline_energy(self.idle_energy, frames), self.idle_threshold, max(2, round(self.idle_seconds * capturer.true_fps)))
+        self.update_markers()
+        self.update_idle_button()
+
+    def build_proxies(self):
+        self.proxy_builder and self.proxy_builder.stop()
+        self.proxies = None
+        self.scene_hashes = None
+        self.idle_energy = None
+        self.range_slider.setFilmstrip(None)
+        if not self.is_sequence:
+            return
+        self.proxy_builder = ProxyBuilder(self.frame_files, self.derived_path("proxy.npy"), self.proxy_width, self.concat_fit)
+        self.proxy_builder.proxy_done_signal.connect(self.proxies_done)
+        self.proxy_builder.start()
 
-    def update_bg_image(self, image_filename):
-        self.bg_pixmap = QPixmap(os.path.join(self.image_dir, image_filename))
-        self.bg_image.setPixmap(self.bg_pixmap)
+    def proxies_done(self, proxy_path):
+        if not self.is_sequence or proxy_path != self.derived_path("proxy.npy"):
+            return
+        self.proxies = load_proxies(proxy_path, self.frame_files, self.concat_fit)
+        if self.proxies is not None:
+            self.update_frame_views()
+            self.analyze_crop()
+            self.analyze_idle()
+            self.index_scenes()
+
+    def analyze_crop(self):
+        self.crop_analyzer and self.crop_analyzer.wait()
+        self.crop_analyzer = CropAnalyzer(self.proxies, self.image_width, self.image_height)
+        self.crop_analyzer.crop_signal.connect(self.crop_analyzed)
+        self.crop_analyzer.start()
+
+    def crop_analyzed(self, rect):
+        if self.sender() is not self.crop_analyzer:
+            return
+        self.crop_analyzer.wait()
+        self.crop_analyzer = None
+        # only worth offering when it saves a good part of the frame
+        area = self.image_width * self.image_height
+        self.crop_suggestion = rect if rect is not None and rect.width() * rect.height() < .9 * area else None
+        self.update_crop_button()
+
+    def analyze_idle(self):
+        self.idle_analyzer and self.idle_analyzer.wait()
+        self.idle_analyzer = IdleAnalyzer(self.proxies)
+        self.idle_analyzer.energy_signal.connect(self.idle_analyzed)
+        self.idle_analyzer.start()
+
+    def idle_analyzed(self, energy):
+        if self.sender() is not self.idle_analyzer:
+            return
+        self.idle_analyzer.wait()
+        self.idle_analyzer = None
+        self.idle_energy = energy
+        self.update_frame_views()
+
+    def update_idle_button(self):
+        self.idle_button.setEnabled(bool(self.idle_spans))
+        self.idle_button.setChecked(self.compress_idle and bool(self.idle_spans))
+        seconds = sum(stop - start for start, stop in self.idle_spans) / capturer.true_fps
+        action = f"Speed up by {self.idle_speed}x" if self.idle_mode == "speed" else f"Cut to a {self.idle_hold:g}s hold"
+        self.idle_button.setToolTip(f"{action} {len(self.idle_spans)} idle spans, {seconds:.1f}s in total, on export" if self.idle_spans else "No idle spans found")
+
+    def toggle_idle(self):
+        self.compress_idle = not self.compress_idle
+        self.update_idle_button()
+        self.schedule_autosave()
+
+    def set_timelapse(self, timelapse):
+        self.timelapse = timelapse
+        self.schedule_autosave()
+
+    def export_frames(self, first, end):
+        """Frames of [first, end) that go into the export, None when every frame does."""
+        spans = self.idle_spans if self.compress_idle else ()
+        frames = cut_out(keep_frames(first, end, spans, self.idle_mode, self.idle_speed, max(1, round(self.idle_hold * capturer.true_fps)), self.timelapse), self.cutouts)
+        return None if len(frames) == end - first else frames
+
+    def export_clips(self):
+        """(name, frames) of every clip that goes into the export, the trimmed range when no clips are marked."""
+        clips = []
+        for name, start, end in export_ranges(self.clips, self.slider.minimum(), self.slider.maximum() + 1):
+            frames = self.export_frames(start, end)
+            frames = list(range(start, end)) if frames is None else frames
+            frames and clips.append((name, frames))
+        return clips
+
+    def create_clips_button(self):
+        menu = QMenu(self)
+        menu.setStyleSheet("QMenu {background-color: #333; color: #fff; border-radius: 5px; padding: 5px;} QMenu::item:selected {background-color: #444;}")
+        menu.addAction("Add Clip", self.add_clip)
+        menu.addAction("Cut Out", self.add_cutout)
+        menu.addAction("Clear", self.clear_clips)
+        menu.addSeparator()
+        separate_action = menu.addAction("Export Separate Files")
+        separate_action.setCheckable(True)
+        separate_action.setChecked(self.clip_export == "separate")
+        separate_action.toggled.connect(lambda checked: setattr(self, "clip_export", "separate" if checked else "join"))
+
+        button = DrawOver.create_button("Clips")
+        button.setStyleSheet(button.styleSheet() + " QPushButton::menu-indicator {image: none;}")
+        button.setFixedSize(56, 40)
+        button.setMenu(menu)
+        button.setToolTip("Mark the trimmed range as a clip or cut it out, clips are exported instead of the trimmed range")
+        return button
+
+    def add_clip(self):
+        name, ok = QInputDialog.getText(self, "Add Clip", "Clip name:", text=f"clip {len(self.clips) + 1}")
+        if ok:
+            self.clips.append([name, self.range_slider.start(), self.range_slider.end() + 1])
+            self.update_clip_bands()
+            self.schedule_autosave()
+
+    def add_cutout(self):
+        self.cutouts.append([self.range_slider.start(), self.range_slider.end() + 1])
+        self.update_clip_bands()
+        self.schedule_autosave()
+
+    def clear_clips(self):
+        self.clips, self.cutouts = [], []
+        self.update_clip_bands()
+        self.schedule_autosave()
+
+    def update_clip_bands(self):
+        self.range_slider.setBands([(start, end - 1, "#3a3") for _, start, end in self.clips] + [(start, end - 1, "#c33") for start, end in self.cutouts])
+
+    def create_frames_button(self):
+        menu = QMenu(self)
+        menu.setStyleSheet("QMenu {background-color: #333; color: #fff; border-radius: 5px; padding: 5px;} QMenu::item:selected {background-color: #444;}")
+        menu.addAction("Cut Frames", self.cut_frames)
+        menu.addAction("Copy Frames", self.copy_frames)
+        paste_action = menu.addAction("Paste Frames", self.paste_frames)
+        menu.addAction("Delete Frames", self.delete_frames)
+        menu.addSeparator()
+        menu.addAction("Hold Frame", self.hold_frame)
+        menu.addSeparator()
+        menu.addAction("Append Video or Project...", self.append_file)
+        menu.addAction("Append Folder...", self.append_directory)
+        menu.aboutToShow.connect(lambda: paste_action.setEnabled(self.frame_clipboard is not None))
+
+        button = DrawOver.create_button("Frames")
+        button.setStyleSheet(button.styleSheet() + " QPushButton::menu-indicator {image: none;}")
+        button.setFixedSize(64, 40)
+        button.setMenu(menu)
+        button.setToolTip("Cut, copy or delete the trimmed range, paste at the current frame or hold it, frames on disk are never changed")
+        return button
+
+    def cut_frames(self):
+        self.copy_frames()
+        self.delete_frames()
+
+    def copy_frames(self):
+        if self.is_sequence:
+            self.frame_clipboard = self.manifest.frames[self.range_slider.start():self.range_slider.end() + 1]
+
+    def paste_frames(self):
+        if self.is_sequence and self.frame_clipboard is not None:
+            at = self.slider.value()
+            self.edit_frames(*self.manifest.insert(at, self.frame_clipboard), show=(at, at + len(self.frame_clipboard) - 1))
 
-    def create_canvas(self):
-        canvas = QLabel()
-        canvas.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        canvas.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
-        self.pixmap = QPixmap(self.canvas_width, self.canvas_height)
-        self.pixmap.fill(Qt.GlobalColor.transparent)
-        canvas.setPixmap(self.pixmap)
+    def delete_frames(self):
+        if self.is_sequence:
+            self.edit_frames(*self.manifest.delete(self.range_slider.start(), self.range_slider.end() + 1))
+
+    def hold_frame(self):
+        if self.is_sequence:
+            frame, count = self.slider.value(), max(1, round(self.hold_seconds * capturer.true_fps))
+            self.edit_frames(*self.manifest.duplicate(frame, count), show=(frame, frame + count))
+
+    def append_file(self):
+        # videos are decoded with ffmpeg
+        videos = "Videos (*.gif *.mp4);;" if capturer.has_ffmpeg() else ""
+        path = QFileDialog.getOpenFileName(self, "Append", "", f"{videos}Projects (*{PROJECT_EXT})")[0]
+        if not path or not self.is_sequence:
+            return
+        if os.path.splitext(path)[1] == PROJECT_EXT:
+            # a project's recorded frames, in its edited order
+            data = load_project(path)
+            if data and data["sequence"]:
+                order = FrameManifest.from_runs(data["manifest"]).frames if data.get("manifest") else None
+                self.append_source(os.path.join(os.path.dirname(path), data["frames"]), order, data["fps"])
+            return
+        # decoded next to the project, or into the cache until there is one
+        parent = os.path.join(os.path.dirname(self.project.path), "sources") if self.project else capturer.cache_dir
+        os.makedirs(parent, exist_ok=True)
+        self.pending_append = tempfile.mkdtemp(prefix="append-", dir=parent)
+        self.show_progress()
+        capturer.decode({"image_path": path, "folder": self.pending_append})
+
+    def append_directory(self):
+        folder = QFileDialog.getExistingDirectory(self, "Append Folder", self.last_save_path)
+        folder and self.is_sequence and self.append_source(folder, fps=Capturer.load_timeline(folder).get("fps"))
+
+    def append_source(self, folder, order=None, fps=None):
+        """Reference the frames in `folder` at the end of the timeline, undoable, nothing is copied.
+        Frames are held or skipped to keep their speed at the timeline's frame rate."""
+        files = source_files(folder)
+        order = np.arange(len(files)) if order is None else np.asarray(order)
+        order = order[order < len(files)]
+        if not len(order):
+            logger.error(f"No frames to append in {folder}")
+            return
+        start = len(self.frame_files)
+        # undone appends can't be redone after this edit, their place is taken
+        self.all_sources[len(self.sources):] = [folder]
+        order = start + order[resample(len(order), fps, capturer.true_fps)]
+        at = len(self.manifest)
+        self.edit_frames(*self.manifest.insert(at, order), show=(at, at + len(order) - 1), sources=len(self.sources) + 1)
+
+    def frame_state(self):
+        """Everything a frame edit changes, kept by the undo history."""
+        return {
+            "manifest": self.manifest,
+            "range": (self.range_slider.start(), self.range_slider.end()),
+            "items": [(item, frame_range(item), getattr(item, "keyframes", None)) for item in self.items],
+            "clips": [list(clip) for clip in self.clips],
+            "cutouts": [list(cutout) for cutout in self.cutouts],
+            "sources": len(self.sources),
+        }
 
-        return canvas
+    def set_frame_state(self, state):
+        items = [item for item, _, _ in state["items"]]
+        for item in self.items:
+            item not in items and item.hide()
+        for item, first_last, keyframes in state["items"]:
+            item.show()
+            set_frame_range(item, first_last)
+            keyframes is not None and item.set_keyframes(keyframes)
+        self.items = items
+        self.clips = [list(clip) for clip in state["clips"]]
+        self.cutouts = [list(cutout) for cutout in state["cutouts"]]
+        if state["sources"] != len(self.sources):
+            self.sources = self.all_sources[:state["sources"]]
+            self.update_frame_files()
+            self.build_proxies()
+        self.set_manifest(state["manifest"], state["range"])
+
+    def edit_frames(self, manifest, origins, show=None, sources=None):
+        """Push a manifest edit, annotations, clips and the trimmed range move with the frames they were on.
+        `sources` is the number of appended sources the edited manifest uses, the same as now if None."""
+        if not len(manifest):
+            logger.error("Can't delete every frame")
+            return
+        before = self.frame_state()
+        first = first_positions(origins, len(self.manifest))
+        items = []
+        for item, first_last, keyframes in before["items"]:
+            if first_last:
+                first_last = remap_range(origins, *first_last)
+                if first_last is None:
+                    continue # every frame it was shown on is gone
+            if keyframes:
+                keyframes = {int(first[frame]): offset for frame, offset in keyframes.items() if 0 <= frame < len(first) and first[frame] >= 0}
+            items.append((item, first_last, keyframes))
+        def remap_span(start, end):
+            span = remap_range(origins, start, end - 1)
+            return span and [span[0], span[1] + 1]
+        first_last = remap_range(origins, *before["range"]) or (0, len(manifest) - 1)
+        if show:
+            first_last = (min(first_last[0], show[0]), max(first_last[1], show[1]))
+        after = {
+            "manifest": manifest,
+            "range": first_last,
+            "items": items,
+            "clips": [[name, *span] for name, span in ((name, remap_span(start, end)) for name, start, end in self.clips) if span],
+            "cutouts": [span for span in (remap_span(start, end) for start, end in self.cutouts) if span],
+            "sources": before["sources"] if sources is None else sources,
+        }
+        self.undo_history.push(EditFramesCmd(self, before, after))
+
+    def set_manifest(self, manifest, first_last=None):
+        self.manifest = manifest
+        self.frame_count = len(manifest)
+        first, last = first_last or (0, self.frame_count - 1)
+        frame = min(max(self.slider.value(), first), last)
+        self.playback.pause()
+        for widget in (self.playback, self.slider, self.range_slider):
+            widget.blockSignals(True)
+        self.range_slider.setMax(self.frame_count - 1)
+        self.range_slider.setRange(first, last)
+        self.slider.setRange(first, last)
+        self.slider.setValue(frame)
+        self.playback.set_range(first, last)
+        self.playback.seek(frame)
+        for widget in (self.playback, self.slider, self.range_slider):
+            widget.blockSignals(False)
+        self.update_bg_image(frame)
+        self.update_clip_bands()
+        self.update_frame_views()
+        self.schedule_autosave()
+
+    def update_crop_button(self):
+        self.crop_button.setEnabled(self.crop_suggestion is not None or self.crop_rect is not None)
+        self.crop_button.setChecked(self.crop_rect is not None)
+        rect = self.crop_rect or self.crop_suggestion
+        self.crop_button.setToolTip(f"Crop to {rect.width()}x{rect.height()}, the area that changes during the recording" if rect else "Nothing to crop, the whole frame changes")
+
+    def toggle_crop(self):
+        self.set_crop(None if self.crop_rect else self.crop_suggestion)
+        self.schedule_autosave()
+
+    def set_crop(self, rect):
+        self.crop_rect = rect
+        if rect is not None:
+            scale = self.canvas_width / self.image_width
+            path = QPainterPath()
+            path.addRect(QRectF(0, 0, self.canvas_width, self.canvas_height))
+            path.addRect(QRectF(QPointF(rect.topLeft()) * scale, QSizeF(rect.size()) * scale))
+            self.crop_item.setPath(path)
+        self.crop_item.setVisible(rect is not None)
+        self.update_crop_button()
 
     def create_timeline(self):
-        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider = QMarkerSlider(Qt.Orientation.Horizontal)
         self.slider.setRange(0, 10)
+        self.slider.setToolTip("Ctrl+Left / Ctrl+Right jump to the previous / next scene change")
+        self.slider.sliderReleased.connect(self.refresh_bg_image)
         self.slider.valueChanged.connect(lambda x: (
-            timeline.blockSignals(True),
-            timeline.setCurrentTime((x - self.slider.minimum()) * (1000/capturer.true_fps)),
-            (timeline.stop(), timeline.resume()) if timeline.state() == QTimeLine.State.Running else None, timeline.blockSignals(False),
-            self.update_bg_image(self.image_filenames[self.slider.value()])
+            playback.seek(x),
+            self.update_bg_image(self.slider.value())
             )
         )
 
-        timeline = QTimeLine(10, parent=self)
-        timeline.setFrameRange(0, 10)
-        timeline.setUpdateInterval(1000.0/capturer.true_fps)
-        timeline.setLoopCount(1)
-        timeline.setEasingCurve(QEasingCurve.Linear)
-        timeline.frameChanged.connect(lambda x: (
+        playback = PlaybackClock(self)
+        playback.is_ready = self.frame_ready
+        playback.frameChanged.connect(lambda x: (
             self.slider.blockSignals(True),
             self.slider.setValue(x),
-            self.update_bg_image(self.image_filenames[self.slider.value()]),
+            self.update_bg_image(self.slider.value()),
             self.slider.blockSignals(False),
             ))
-        timeline.stateChanged.connect(lambda x: (
-            play_button.hide() if x == QTimeLine.State.Running else play_button.show(),
-            pause_button.show() if x == QTimeLine.State.Running else pause_button.hide(),
+        playback.stateChanged.connect(lambda running: (
+            play_button.hide() if running else play_button.show(),
+            pause_button.show() if running else pause_button.hide(),
+            not running and self.refresh_bg_image(),
+            not running and logger.info(f"Playback: {playback.stats()}"),
         ))
 
         play_button = DrawOver.create_button("", f"{app_path}/icon/play-fill.png", "#0d6efd", "#0b5ed7", "#0a58ca")
         play_button.setFixedSize(50, 40)
-        play_button.clicked.connect(lambda: (
-            timeline.start() if self.slider.value() == self.slider.maximum() else timeline.resume(),
-            play_button.hide(),
-            pause_button.show()))
+        play_button.clicked.connect(playback.play)
 
         pause_button = DrawOver.create_button("", f"{app_path}/icon/pause.png", "#0d6efd", "#0b5ed7", "#0a58ca")
         pause_button.setFixedSize(50, 40)
-        pause_button.clicked.connect(lambda: (timeline.setPaused(True)))
+        pause_button.clicked.connect(playback.pause)
         pause_button.hide()
 
         stop_button = DrawOver.create_button("", f"{app_path}/icon/stop-fill.png")
         stop_button.setFixedSize(50, 40)
-        stop_button.clicked.connect(lambda: (timeline.stop(), timeline.setCurrentTime(0)))
+        stop_button.clicked.connect(playback.stop)
 
         button_layout = QHBoxLayout()
         button_layout.setSpacing(2)
@@ -1290,22 +1835,60 @@ class DrawOver(QMainWindow):
         button_layout.addWidget(pause_button)
         # button_layout.addWidget(stop_button)
 
+        # in/out frames of the selected annotations, or the last one drawn
+        in_button = DrawOver.create_button("In", callback=self.set_item_in)
+        in_button.setFixedSize(40, 40)
+        in_button.setToolTip("Show selected annotations from this frame")
+        out_button = DrawOver.create_button("Out", callback=self.set_item_out)
+        out_button.setFixedSize(40, 40)
+        out_button.setToolTip("Show selected annotations until this frame")
+        all_button = DrawOver.create_button("All", callback=self.reset_item_range)
+        all_button.setFixedSize(40, 40)
+        all_button.setToolTip("Show selected annotations on every frame")
+        self.track_button = DrawOver.create_button("Track", callback=self.track_item)
+        self.track_button.setFixedSize(56, 40)
+        self.track_button.setToolTip("Follow the selected redaction through its frames, drag it with the select tool to correct a frame")
+        self.crop_button = DrawOver.create_button("Crop", callback=self.toggle_crop)
+        self.crop_button.setFixedSize(56, 40)
+        self.crop_button.setCheckable(True)
+        self.crop_button.setEnabled(False)
+        self.idle_button = DrawOver.create_button("Idle", callback=self.toggle_idle)
+        self.idle_button.setFixedSize(56, 40)
+        self.idle_button.setCheckable(True)
+        self.idle_button.setEnabled(False)
+        self.timelapse_spinner = QSpinBox()
+        self.timelapse_spinner.setFixedSize(56, 40)
+        self.timelapse_spinner.setRange(1, 64)
+        self.timelapse_spinner.setSuffix("x")
+        self.timelapse_spinner.setValue(self.timelapse)
+        self.timelapse_spinner.setToolTip("Time-lapse, keep every nth frame on export")
+        self.timelapse_spinner.valueChanged.connect(self.set_timelapse)
+
+        item_range_layout = QHBoxLayout()
+        item_range_layout.setSpacing(2)
+        item_range_layout.addWidget(in_button)
+        item_range_layout.addWidget(out_button)
+        item_range_layout.addWidget(all_button)
+        item_range_layout.addWidget(self.track_button)
+        item_range_layout.addWidget(self.crop_button)
+        item_range_layout.addWidget(self.idle_button)
+        item_range_layout.addWidget(self.timelapse_spinner)
+        item_range_layout.addWidget(self.create_clips_button())
+        item_range_layout.addWidget(self.create_frames_button())
+
         range_slider = QRangeSlider()
         range_slider.setRange(0, 10)
         range_slider.startValueChanged.connect(lambda x: (
             self.slider.setMinimum(x),
             self.slider.setValue(x),
-            timeline.blockSignals(True),
-            timeline.setCurrentTime((self.slider.value() - x) * (1000/capturer.true_fps)),
-            timeline.blockSignals(False),
-            timeline.setFrameRange(x, range_slider.end()),
-            timeline.setDuration((range_slider.end() - x) * (1000/capturer.true_fps))
+            playback.set_range(x, range_slider.end()),
+            self.schedule_autosave(),
             ))
         range_slider.endValueChanged.connect(lambda x: (
             self.slider.setMaximum(x),
             self.slider.setValue(x),
-            timeline.setFrameRange(range_slider.start(), x),
-            timeline.setDuration((x - range_slider.start()) * (1000/capturer.true_fps))
+            playback.set_range(range_slider.start(), x),
+            self.schedule_autosave(),
             ))
 
         range_layout = QVBoxLayout()
@@ -1318,6 +1901,7 @@ class DrawOver(QMainWindow):
         slider_layout.setSpacing(10)
         slider_layout.addLayout(button_layout, 0)
         slider_layout.addLayout(range_layout, 1)
+        slider_layout.addLayout(item_range_layout, 0)
 
         layout = QVBoxLayout()
         layout.setSpacing(4)
@@ -1325,33 +1909,35 @@ class DrawOver(QMainWindow):
         timeline_widget = QWidget()
         # timeline_widget.setStyleSheet( "QWidget {background-color: #2a2a2a; border-radius: 5px; padding: 5px;}")
         timeline_widget.setLayout(layout)
-        self.timeline = timeline
+        self.playback = playback
+        self.range_slider = range_slider
 
         def update():
             timeline_widget.setVisible(self.is_sequence)
             if self.is_sequence:
-                timeline.blockSignals(True)
+                playback.blockSignals(True)
                 self.slider.blockSignals(True)
                 range_slider.blockSignals(True)
 
+                playback.pause()
                 self.slider.setRange(0, self.frame_count - 1)
                 self.slider.setValue(0)
 
-                timeline.setDuration(self.duration)
-                timeline.setFrameRange(0, self.frame_count - 1)
-                timeline.setUpdateInterval(1000.0/capturer.true_fps)
-                timeline.setCurrentTime(0)
+                playback.fps = capturer.true_fps
+                playback.set_range(0, self.frame_count - 1)
+                playback.seek(0)
 
                 range_slider.setMax(self.frame_count - 1)
                 range_slider.setRange(0, self.frame_count - 1)
 
-                self.update_bg_image(self.image_filenames[0])
+                self.current_frame = 0
+                self.update_bg_image(0)
 
-                timeline.blockSignals(False)
+                playback.blockSignals(False)
                 self.slider.blockSignals(False)
                 range_slider.blockSignals(False)
 
-        timeline.update = update
+        self.update_timeline = update
 
         return timeline_widget
 
@@ -1485,6 +2071,24 @@ class DrawOver(QMainWindow):
 
         return menu_action
 
+    def create_redact_tool(self):
+        menu = QMenu(self)
+        menu.setStyleSheet("QMenu {background-color: #333; color: #fff; border-radius: 5px; padding: 5px;} QMenu::item:selected {background-color: #444;}")
+
+        menu_action = QAction(QIcon(f"{app_path}/icon/pixelate.png"), "", self)
+        menu_action.setMenu(menu)
+
+        mode_group = QActionGroup(menu)
+        for mode in REDACT_MODES:
+            mode_action = QAction(mode.capitalize(), menu)
+            mode_action.setCheckable(True)
+            mode_action.setChecked(mode == self.redact_mode)
+            mode_action.triggered.connect(lambda *args, _mode=mode: (setattr(self, "redact_mode", _mode), self.set_tool("redact")))
+            mode_group.addAction(mode_action)
+            menu.addAction(mode_action)
+
+        return menu_action
+
     def set_tool(self, tool):
         if tool == "select":
             self.set_select_tool()
@@ -1506,9 +2110,17 @@ class DrawOver(QMainWindow):
             self.set_ellipse_tool(filled=True)
         elif tool == "text":
             self.set_text_tool()
+        elif tool == "redact":
+            self.set_redact_tool()
         else:
             self.set_select_tool()
 
+        self.view.setDragMode(QGraphicsView.DragMode.ScrollHandDrag if self.current_tool == "select" else QGraphicsView.DragMode.NoDrag)
+        # annotations are only picked with the select tool, the others draw over them
+        for item in self.items:
+            item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, self.current_tool == "select")
+        self.current_tool != "select" and self.scene.clearSelection()
+        self.update_item_ranges()
         self.update_brush_params()
     
     def set_select_tool(self):
@@ -1545,6 +2157,10 @@ class DrawOver(QMainWindow):
         self.current_tool = "text"
         self.text_tool.setChecked(True)
 
+    def set_redact_tool(self):
+        self.current_tool = "redact"
+        self.redact_tool.setChecked(True)
+
     def update_brush_params(self):
         color = None
         width = None
@@ -1554,6 +2170,9 @@ class DrawOver(QMainWindow):
         elif self.current_tool == "text":
             color = self.text_color
             width = self.text_size
+        elif self.current_tool == "redact":
+            color = self.shape_color
+            width = self.redact_strength
         else:
             color = self.pen_color
             width = self.pen_width
@@ -1572,7 +2191,8 @@ class DrawOver(QMainWindow):
             self.separator1.setVisible(False)
             self.separator2.setVisible(False)
         else:
-            self.color_picker.setVisible(True)
+            # redaction has a strength but no color
+            self.color_picker.setVisible(self.current_tool != "redact")
             self.width_tool.setVisible(True)
             self.separator1.setVisible(True)
             self.separator2.setVisible(True)
@@ -1591,6 +2211,8 @@ class DrawOver(QMainWindow):
             self.shape_width = width
         elif self.current_tool == "text":
             self.text_size = width
+        elif self.current_tool == "redact":
+            self.redact_strength = width
         else:
             self.pen_width = width
         self.update_brush_params()
@@ -1615,12 +2237,41 @@ class DrawOver(QMainWindow):
     
     def decoding_done(self, filepath):
         self.progress.close()
-        if filepath:
+        if filepath and filepath == self.pending_append:
+            self.append_source(filepath, fps=Capturer.load_timeline(filepath).get("fps"))
+        elif filepath:
             self.load_file(filepath)
+        elif self.pending_append:
+            # the video couldn't be decoded, nothing to append
+            shutil.rmtree(self.pending_append, ignore_errors=True)
+        self.pending_append = None
 
     def save_video(self, filepath):
         self.progress.close()
-        if filepath:
+        if filepath and os.path.isdir(filepath):
+            # separate clips or a sprite sheet, the files keep their names and go into the chosen folder
+            self.last_save_path = self.last_save_path if os.path.exists(self.last_save_path) else os.path.expanduser("~")
+            filenames = sorted(os.listdir(filepath))
+            folder = QFileDialog.getExistingDirectory(self, "Save Files", self.last_save_path)
+            # checked before anything is moved, a clash halfway would leave part of the export behind
+            while folder and any(os.path.exists(os.path.join(folder, filename)) for filename in filenames):
+                answer = QMessageBox.question(self, "Save Files", f"Some of the files already exist in {folder}. Replace them?")
+                if answer == QMessageBox.StandardButton.Yes:
+                    break
+                folder = QFileDialog.getExistingDirectory(self, "Save Files", folder)
+            if folder:
+                try:
+                    for filename in filenames:
+                        target = os.path.join(folder, filename)
+                        # moving onto an existing file fails on Windows
+                        os.path.isfile(target) and os.remove(target)
+                        shutil.move(os.path.join(filepath, filename), target)
+                    self.last_save_path = folder
+                except Exception as e:
+                    logger.error(e)
+            # the export's temporary folder, emptied or not
+            shutil.rmtree(filepath, ignore_errors=True)
+        elif filepath:
             filename = "peek"
             ext = os.path.splitext(os.path.basename(filepath))[1]
             number = 1
@@ -1630,7 +2281,7 @@ class DrawOver(QMainWindow):
 
             filename = f"peek_{str(number)}{ext}"
             self.last_save_path = self.last_save_path if os.path.exists(self.last_save_path) else os.path.expanduser("~")
-            new_filepath = QFileDialog.getSaveFileName(self, "Save Video", os.path.join(self.last_save_path, filename), f"Videos (*.{capturer.v_ext})")
+            new_filepath = QFileDialog.getSaveFileName(self, "Save Video", os.path.join(self.last_save_path, filename), f"Videos (*{ext})")
             
             if new_filepath[0]:
                 try:
@@ -1640,8 +2291,9 @@ class DrawOver(QMainWindow):
                     logger.error(e)
 
     def save_screenshot(self, encode_options):
-        if encode_options and encode_options["drawover_image_path"]:
-            self.image_path = capturer.screenshot_drawover(encode_options["drawover_image_path"])
+        image = self.bg_image
+        if encode_options and (encode_options["drawover_image"] or encode_options["drawover_redactions"]):
+            image = capturer.screenshot_drawover(image, encode_options)
         
         filename = "peek"
         ext = capturer.i_ext
@@ -1654,94 +2306,206 @@ class DrawOver(QMainWindow):
         new_filepath = QFileDialog.getSaveFileName(self, "Save Image", os.path.join(self.last_save_path, filename), f"Images (*.{ext})")
         
         if new_filepath[0]:
-            try:
-                # image_ext = os.path.splitext(os.path.basename(self.image_path))[1]
-                # if image_ext == ext:
-                #     shutil.copy(self.image_path, new_filepath[0])
-                # else:
-                #     pixmap = QPixmap(self.image_path)
-                #     pixmap.save(new_filepath[0], ext, 60 if self.quality == "md" else 100)
-                shutil.copy(self.image_path, new_filepath[0])
+            # encoded once, straight from memory to the chosen file
+            if image.save(new_filepath[0], os.path.splitext(new_filepath[0])[1][1:] or ext, 60 if capturer.quality == "md" else 100):
                 self.last_save_path = os.path.dirname(new_filepath[0])
-            except Exception as e:
-                logger.error(e)
-
-    def save_file(self):
-        encode_options = {"drawover_image_path": None, "drawover_range":None}
-        if len(self.items) > 0:
-            range = (self.slider.minimum(), self.slider.maximum() + 1) if self.slider else None
-            drawover_image_path = f'{capturer.current_cache_folder}/peek_{capturer.UID}_drawover.png'
-            os.makedirs(capturer.current_cache_folder, exist_ok=True)
-            encode_options = {"drawover_image_path": drawover_image_path, "drawover_range":range }
-            self.canvas_widget.hide()
-            pixmap = QPixmap(self.image_width, self.image_height)
-            pixmap.fill(Qt.GlobalColor.transparent)
-            painter = QPainter(pixmap)
-            painter.setRenderHint(QPainter.Antialiasing,True)
-            self.scene.render(painter, QRectF(), QRectF(0, 0, self.image_width, self.image_height), Qt.KeepAspectRatio)
-            painter.end()
-            self.canvas_widget.show()
-            pixmap.save(drawover_image_path, "png", 100)
+            else:
+                logger.error(f"Can't save {new_filepath[0]}")
+
+    def render_drawover(self, items=None):
+        """Render the annotations cropped to their bounds, returns the image and its offset in the frame, None if nothing is drawn."""
+        items = self.overlay_items() if items is None else items
+        scale = self.image_width / self.canvas_width
+        bounds = QRectF()
+        for item in items:
+            bounds |= item.sceneBoundingRect()
+        rect = QRectF(bounds.topLeft() * scale, bounds.size() * scale).toAlignedRect() & QRect(0, 0, self.image_width, self.image_height)
+        if rect.isEmpty():
+            return None, QPoint()
+
+        self.scene.setFocusItem(None)
+        self.scene.clearSelection()
+        self.bg_item.hide()
+        self.crop_item.hide()
+        # only the given annotations, at full opacity
+        hidden = [item for item in self.items if item not in items and item.isVisible()]
+        opacities = [(item, item.opacity()) for item in self.items]
+        for item in hidden:
+            item.hide()
+        for item, _ in opacities:
+            item.setOpacity(1)
+        image = QImage(rect.size(), QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing,True)
+        self.scene.render(painter, QRectF(image.rect()), QRectF(QPointF(rect.topLeft()) / scale, QSizeF(rect.size()) / scale), Qt.IgnoreAspectRatio)
+        painter.end()
+        self.bg_item.show()
+        self.crop_item.setVisible(self.crop_rect is not None)
+        for item in hidden:
+            item.show()
+        for item, opacity in opacities:
+            item.setOpacity(opacity)
+        return image, rect.topLeft()
+
+    def render_overlays(self, first, end):
+        """One overlay per distinct set of annotations in frames [first, end), returns (image, offset, first, end) for every run of frames."""
+        overlays, rendered = [], {}
+        for items, start, stop in overlay_runs(self.overlay_items(), first, end):
+            key = frozenset(id(item) for item in items)
+            if key not in rendered:
+                rendered[key] = self.render_drawover(items)
+            if rendered[key][0] is not None:
+                overlays.append((*rendered[key], start, stop))
+        return overlays
+
+    def overlay_items(self):
+        # redactions change the frame pixels instead of being drawn over them
+        return [item for item in self.items if not isinstance(item, RedactItem)]
+
+    def redactions(self, frames):
+        """Regions to redact in image pixels, {frame: [(rect, mode, strength), ...]} for the frames that have any."""
+        scale = self.image_width / self.canvas_width
+        items = [item for item in self.items if isinstance(item, RedactItem)]
+        redactions = {}
+        for frame in frames if items else ():
+            active = [(item.image_rect(scale, frame), item.mode, item.strength) for item in items if is_active(item, frame)]
+            if active:
+                redactions[frame] = active
+        return redactions
+
+    def redact_background(self):
+        scrubbing = self.is_sequence and self.slider.isSliderDown()
+        return self.bg_item, self.bg_item.pixmap().width() / self.image_width if self.image_width else 1, self.bg_key, scrubbing
+
+    def create_export_button(self):
+        menu = QMenu(self)
+        menu.setStyleSheet("QMenu {background-color: #333; color: #fff; border-radius: 5px; padding: 5px;} QMenu::item:selected {background-color: #444;}")
+        sprite_actions = [menu.addAction(f"Save Sprite Sheet ({fmt.upper()})", lambda fmt=fmt: self.save_file(sprite_sheet=fmt)) for fmt in SPRITE_FORMATS]
+        menu.addSeparator()
+        trim_action = menu.addAction("Trim Sprites")
+        trim_action.setCheckable(True)
+        trim_action.setChecked(self.sprite_trim)
+        trim_action.toggled.connect(lambda checked: setattr(self, "sprite_trim", checked))
+        menu.aboutToShow.connect(lambda: [action.setEnabled(self.is_sequence) for action in sprite_actions])
+
+        button = DrawOver.create_button("", "", "#0d6efd", "#0b5ed7", "#0a58ca")
+        button.setStyleSheet(button.styleSheet() + " QPushButton::menu-indicator {subcontrol-position: center;}")
+        button.setFixedWidth(30)
+        button.setMenu(menu)
+        button.setToolTip("Other export formats")
+        return button
+
+    def save_file(self, sprite_sheet=None):
+        encode_options = {"drawover_image": None, "drawover_overlays": [], "drawover_redactions": {}, "drawover_range":None, "crop": None, "frames": None, "clips": None, "frame_paths": None, "frame_size": None, "fit": "pad", "sprite_sheet": None}
+        os.makedirs(capturer.current_cache_folder, exist_ok=True)
+        if len(self.items) > 0 and not self.is_sequence:
+            image, pos = self.render_drawover()
+            encode_options["drawover_image"] = (image, pos) if image is not None else None
+            encode_options["drawover_redactions"] = self.redactions([0])
 
         if self.is_sequence:
+            clips = self.export_clips()
+            if not clips:
+                logger.error("Nothing to export, every frame is cut out")
+                return
             self.show_progress()
-            encode_options["drawover_range"] = (self.slider.minimum(), self.slider.maximum() + 1)
+            # all clips go through one ffmpeg run, joined or split into a file each
+            frames = [frame for _, clip in clips for frame in clip]
+            encode_options["drawover_range"] = (min(frames), max(frames) + 1)
+            encode_options["drawover_overlays"] = self.render_overlays(*encode_options["drawover_range"])
+            encode_options["drawover_redactions"] = self.redactions(sorted(set(frames)))
+            encode_options["crop"] = self.crop_rect
+            encode_options["frames"] = None if frames == list(range(*encode_options["drawover_range"])) else frames
+            encode_options["clips"] = [(name, len(clip)) for name, clip in clips] if self.clip_export == "separate" and len(clips) > 1 and not sprite_sheet else None
+            # an edited timeline is read through the manifest, frames on disk stay as they were recorded
+            encode_options["frame_paths"] = None if self.manifest.is_identity(len(self.image_filenames)) else [self.frame_path(frame) for frame in range(self.frame_count)]
+            # appended frames of another size or format are fitted to the recording's size while they are piped
+            encode_options["frame_size"] = QSize(self.image_width, self.image_height) if self.sources else None
+            encode_options["fit"] = self.concat_fit
+            # clips are packed into one sheet, identical frames are only stored once
+            encode_options["sprite_sheet"] = {"format": sprite_sheet, "trim": self.sprite_trim} if sprite_sheet else None
             capturer.encode(encode_options)
         else:
             self.save_screenshot(encode_options)
 
-    def load_file(self, image_path=None):
+    def load_file(self, image_path=None, image=None):
+        if image_path and os.path.splitext(image_path)[1] == PROJECT_EXT:
+            self.open_project(image_path)
+            return
+
+        self.close_project()
         self.clear_canvas()
+        self.crop_suggestion = None
+        self.set_crop(None)
+        self.idle_spans = []
+        self.compress_idle = False
+        self.update_idle_button()
+        self.timelapse_spinner.setValue(1)
+        self.clips, self.cutouts = [], []
+        self.update_clip_bands()
+        self.sources, self.all_sources = [], []
+        self.frame_files = []
+        self.manifest = FrameManifest.identity(0)
+        self.frame_clipboard = None
+        self.scene_hashes = None
+        self.idle_energy = None
         self.view.setTransform(QTransform())
         
-        if image_path and os.path.isfile(image_path):
+        if image is None and image_path and os.path.isfile(image_path):
             ext = os.path.splitext(image_path)[1]
 
             if ext in [".gif", ".mp4"]:
                 self.show_progress()
                 capturer.decode({"image_path":image_path})
                 return
-            elif ext in [".jpg", ".jpeg", ".png"]:
-                dirname = os.path.dirname(image_path)
-                if dirname != capturer.current_cache_folder:
-                    # its a file from outsourced folder
-                    pixmap = QPixmap(image_path)
-                    image_path = f'{capturer.current_cache_folder}/peek_{capturer.UID}.{capturer.i_ext}'
-                    pixmap.save(image_path, capturer.i_ext, 60 if capturer.quality == "md" else 100 )
-            else:
+            elif ext not in [".jpg", ".jpeg", ".png"]:
                 logger.error(f"Unsupported file format: {ext}")
                 return
 
-        if image_path and os.path.isdir(image_path):
+        # stills stay in memory as a QImage until they are saved
+        self.bg_image = None
+        if image is not None:
+            self.is_sequence = False
+            self.bg_image = image
+            self.image_path = image_path
+            self.image_dir = None
+        elif image_path and os.path.isdir(image_path):
             self.image_dir = image_path
             self.image_path = None
             image_dir = QDir(image_path)
             self.image_filenames = image_dir.entryList(['*.jpg'], QDir.Filter.Files, QDir.SortFlag.Name)
+            self.frame_prefetcher.stop()
+            self.frame_cache.clear()
             self.is_sequence = True
             self.bg_pixmap = QPixmap(os.path.join(image_path, self.image_filenames[0]))
-            self.frame_count = len(self.image_filenames)
-            self.duration = (float(self.frame_count) / capturer.true_fps)*1000
+            self.update_frame_files()
+            self.manifest = FrameManifest.identity(len(self.frame_files))
+            self.frame_count = len(self.manifest)
         elif image_path and os.path.isfile(image_path):
             self.is_sequence = False
-            self.bg_pixmap = QPixmap(image_path)
+            self.bg_image = QImage(image_path)
             self.image_path = image_path
             self.image_dir = None
         else:
             self.is_sequence = False
-            self.bg_pixmap = QPixmap(self.new_image_width, self.new_image_height)
-            self.bg_pixmap.fill(Qt.GlobalColor.white)
+            self.bg_image = QImage(self.new_image_width, self.new_image_height, QImage.Format.Format_RGB32)
+            self.bg_image.fill(Qt.GlobalColor.white)
             self.image_path = f'{capturer.current_cache_folder}/peek_{capturer.UID}.{capturer.i_ext}'
             self.image_dir = None
-            os.makedirs(capturer.current_cache_folder, exist_ok=True)
-            self.bg_pixmap.save(self.image_path, capturer.i_ext, 100)
+        if self.bg_image is not None:
+            self.bg_pixmap = QPixmap.fromImage(self.bg_image)
 
-        self.timeline.update()
-        self.bg_image.setPixmap(self.bg_pixmap)
+        self.update_timeline()
+        self.pauses = Capturer.load_timeline(self.image_dir).get("pauses", []) if self.is_sequence else []
+        self.scene_cuts = []
+        self.update_markers()
+        self.build_proxies()
 
         self.canvas_width = self.image_width = self.bg_pixmap.width()
         self.canvas_height = self.image_height = self.bg_pixmap.height()
 
-        self.canvas_widget.resize(self.canvas_width, self.canvas_height)
+        self.set_bg_pixmap(self.bg_pixmap)
         self.scene.setSceneRect(0, 0, self.canvas_width, self.canvas_height)
 
         window_width = self.canvas_width + 35
@@ -1769,9 +2533,140 @@ class DrawOver(QMainWindow):
             logger.error(e)
     
     def open_file(self):
-        image_path = QFileDialog.getOpenFileName(self, "Open File", "", "Images (*.png *.jpg *.jpeg *.gif *.mp4)")[0]
+        videos = " *.gif *.mp4" if capturer.has_ffmpeg() else ""
+        image_path = QFileDialog.getOpenFileName(self, "Open File", "", f"Images (*.png *.jpg *.jpeg{videos});;Projects (*{PROJECT_EXT})")[0]
         image_path and self.load_file(image_path)
 
+    def projects_dir(self):
+        return os.path.join(user_path, "projects")
+
+    def schedule_autosave(self):
+        # the project is created with the first annotation, recordings nobody drew on are not kept
+        if self.project is None and self.items:
+            self.project = self.create_project()
+        self.project and self.autosave_timer.start()
+
+    def create_project(self):
+        self.prune_projects(self.max_projects - 1)
+        name = time.strftime("%Y%m%d-%H%M%S")
+        project_dir = os.path.join(self.projects_dir(), name)
+        try:
+            os.makedirs(project_dir, exist_ok=True)
+            in_cache = lambda folder: os.path.dirname(folder) == capturer.cache_dir
+            if self.is_sequence and (in_cache(self.image_dir) or any(map(in_cache, self.all_sources))):
+                # take the frame store and appended videos out of the cache folder, it's cleared on startup and by the next capture
+                self.frame_prefetcher.stop()
+                self.proxy_builder and self.proxy_builder.stop()
+                self.scene_indexer and self.scene_indexer.stop()
+                self.proxies = None
+                if in_cache(self.image_dir):
+                    frames_dir = os.path.join(project_dir, "frames")
+                    os.replace(self.image_dir, frames_dir)
+                    self.image_dir = capturer.current_cache_folder = frames_dir
+                for i, folder in enumerate(self.all_sources):
+                    if in_cache(folder) and os.path.isdir(folder):
+                        self.all_sources[i] = os.path.join(project_dir, "sources", os.path.basename(folder))
+                        os.makedirs(os.path.dirname(self.all_sources[i]), exist_ok=True)
+                        os.replace(folder, self.all_sources[i])
+                self.sources = self.all_sources[:len(self.sources)]
+                self.update_frame_files()
+                self.frame_cache.clear()
+                self.build_proxies()
+            elif not self.is_sequence and os.path.dirname(self.image_path) != capturer.current_cache_folder:
+                shutil.copy(self.image_path, project_dir)
+            elif not self.is_sequence:
+                # screenshots and new canvases may only be in memory
+                capturer.save_image(self.bg_image, os.path.join(project_dir, os.path.basename(self.image_path)))
+        except Exception as e:
+            logger.error(e)
+            return None
+        return Project(os.path.join(project_dir, name + PROJECT_EXT))
+
+    def prune_projects(self, keep):
+        if not os.path.isdir(self.projects_dir()):
+            return
+        projects = sorted((os.path.join(self.projects_dir(), name) for name in os.listdir(self.projects_dir())), key=os.path.getmtime)
+        for project_dir in projects[:max(0, len(projects) - keep)]:
+            shutil.rmtree(project_dir, ignore_errors=True)
+
+    def project_state(self):
+        project_dir = os.path.dirname(self.project.path)
+        frames = self.image_dir if self.is_sequence else os.path.join(project_dir, os.path.basename(self.image_path))
+        return {
+            "uid": capturer.UID,
+            "sequence": self.is_sequence,
+            "frames": os.path.relpath(frames, project_dir) if os.path.dirname(frames) == project_dir else frames,
+            "fps": capturer.true_fps,
+            "frame_count": self.frame_count,
+            "duration": self.frame_count / capturer.true_fps * 1000 if self.is_sequence else 0,
+            "width": self.image_width,
+            "height": self.image_height,
+            "range": [self.range_slider.start(), self.range_slider.end()] if self.is_sequence else None,
+            "manifest": self.manifest.runs() if self.is_sequence else None,
+            "sources": [os.path.relpath(folder, project_dir) if folder.startswith(project_dir + os.sep) else folder for folder in self.sources],
+            "crop": list(self.crop_rect.getRect()) if self.crop_rect else None,
+            "compress_idle": self.compress_idle,
+            "timelapse": self.timelapse,
+            "clips": self.clips,
+            "cutouts": self.cutouts,
+        }
+
+    def save_project(self):
+        self.project and self.project.save(self.project_state(), self.items)
+
+    def close_project(self):
+        if self.project:
+            self.autosave_timer.stop()
+            self.save_project()
+            self.project = None
+            capturer.use_cache_folder()
+
+    def open_project(self, project_path):
+        data = load_project(project_path)
+        if data is None:
+            return
+        frames = os.path.join(os.path.dirname(project_path), data["frames"])
+        if not os.path.exists(frames):
+            logger.error(f"Frames of {project_path} are missing: {frames}")
+            return
+
+        # frames are used as they are, nothing is decoded
+        capturer.UID = data["uid"]
+        capturer.true_fps = data["fps"]
+        self.load_file(frames)
+        if data["sequence"]:
+            capturer.current_cache_folder = frames
+            capturer.capture_count = self.frame_count
+            sources = [os.path.join(os.path.dirname(project_path), folder) for folder in data.get("sources", [])]
+            missing = [folder for folder in sources if not os.path.isdir(folder)]
+            if missing:
+                # without every source the manifest can't be trusted, the recording is opened as it was recorded
+                logger.error(f"Appended frames of {project_path} are missing: {missing}")
+            elif sources:
+                self.sources, self.all_sources = sources, list(sources)
+                self.update_frame_files()
+                self.build_proxies()
+            manifest = FrameManifest.from_runs(data.get("manifest") or [])
+            if not missing and len(manifest) and manifest.frames.max() < len(self.frame_files):
+                self.set_manifest(manifest)
+            self.range_slider.setRange(*data["range"])
+            data.get("crop") and self.set_crop(QRect(*data["crop"]))
+            self.compress_idle = data.get("compress_idle", False)
+            self.update_idle_button()
+            self.timelapse_spinner.setValue(data.get("timelapse", 1))
+            self.clips, self.cutouts = data.get("clips", []), data.get("cutouts", [])
+            self.update_clip_bands()
+
+        for item_data in data["items"]:
+            item = item_from_dict(item_data)
+            if item:
+                self.setup_item(item)
+                self.scene.addItem(item)
+                self.items.append(item)
+        self.update_item_ranges()
+        self.undo_history.clear_history()
+        self.project = Project(project_path)
+
     def new_file(self):
         # create dialog with image width and image height inputs
         dialog = QDialog(self)
@@ -1829,6 +2724,7 @@ class DrawOver(QMainWindow):
 
         capturer.fullscreen = config.getboolean('capture', 'fullscreen', fallback=True)
         capturer.v_ext = config.get('capture', 'v_ext', fallback='gif')
+        capturer.v_ext = capturer.v_ext if capturer.v_ext in ANIMATED_FORMATS or capturer.has_ffmpeg() else 'webp'
         capturer.fps = capturer.true_fps = config.getint('capture', 'fps', fallback=15)
         capturer.i_ext = config.get('capture', 'img_format', fallback='jpg')
         capturer.quality = config.get('capture', 'quality', fallback='hi')
@@ -1849,6 +2745,35 @@ class DrawOver(QMainWindow):
         self.shape_width = config.getint('drawover', 'shape_width', fallback=3)
         self.text_color = config.get('drawover', 'text_color', fallback='black')
         self.text_size = config.getint('drawover', 'text_size', fallback=13)
+        self.frame_cache_mb = config.getint('drawover', 'frame_cache_mb', fallback=512)
+        self.prefetch_depth = config.getint('drawover', 'prefetch_depth', fallback=8)
+        self.proxy_width = config.getint('drawover', 'proxy_width', fallback=160)
+        self.pen_tolerance = config.getfloat('drawover', 'pen_tolerance', fallback=0.5)
+        self.pen_smoothing = config.getboolean('drawover', 'pen_smoothing', fallback=False)
+        self.scene_index = config.get('drawover', 'scene_index', fallback='bsp')
+        self.item_cache = config.get('drawover', 'item_cache', fallback='device')
+        self.scene_index = self.scene_index if self.scene_index in SCENE_INDEX_METHODS else 'bsp'
+        self.item_cache = self.item_cache if self.item_cache in ITEM_CACHE_MODES else 'device'
+        self.undo_limit = config.getint('drawover', 'undo_limit', fallback=500)
+        self.undo_memory_mb = config.getint('drawover', 'undo_memory_mb', fallback=256)
+        self.undo_merge_ms = config.getint('drawover', 'undo_merge_ms', fallback=300)
+        self.max_projects = config.getint('drawover', 'max_projects', fallback=20)
+        self.scene_cut_distance = config.getint('drawover', 'scene_cut_distance', fallback=10)
+        self.idle_mode = config.get('drawover', 'idle_mode', fallback='speed')
+        self.idle_mode = self.idle_mode if self.idle_mode in IDLE_MODES else 'speed'
+        self.idle_seconds = config.getfloat('drawover', 'idle_seconds', fallback=2.0)
+        self.idle_threshold = config.getfloat('drawover', 'idle_threshold', fallback=0.002)
+        self.idle_speed = config.getint('drawover', 'idle_speed', fallback=8)
+        self.idle_hold = config.getfloat('drawover', 'idle_hold', fallback=0.5)
+        self.redact_mode = config.get('drawover', 'redact_mode', fallback='pixelate')
+        self.redact_mode = self.redact_mode if self.redact_mode in REDACT_MODES else 'pixelate'
+        self.redact_strength = config.getint('drawover', 'redact_strength', fallback=12)
+        self.clip_export = config.get('drawover', 'clip_export', fallback='join')
+        self.clip_export = self.clip_export if self.clip_export in CLIP_EXPORTS else 'join'
+        self.hold_seconds = config.getfloat('drawover', 'hold_seconds', fallback=1.0)
+        self.concat_fit = config.get('drawover', 'concat_fit', fallback='pad')
+        self.concat_fit = self.concat_fit if self.concat_fit in FIT_MODES else 'pad'
+        self.sprite_trim = config.getboolean('drawover', 'sprite_trim', fallback=False)
     
     def save_settings(self):
         config_file = os.path.join(user_path, 'peek.cfg')
@@ -1869,26 +2794,49 @@ class DrawOver(QMainWindow):
             'shape_color': self.shape_color,
             'shape_width': str(self.shape_width),
             'text_color': self.text_color,
-            'text_size': str(self.text_size)
+            'text_size': str(self.text_size),
+            'frame_cache_mb': str(self.frame_cache_mb),
+            'prefetch_depth': str(self.prefetch_depth),
+            'proxy_width': str(self.proxy_width),
+            'pen_tolerance': str(self.pen_tolerance),
+            'pen_smoothing': str(self.pen_smoothing),
+            'scene_index': self.scene_index,
+            'item_cache': self.item_cache,
+            'undo_limit': str(self.undo_limit),
+            'undo_memory_mb': str(self.undo_memory_mb),
+            'undo_merge_ms': str(self.undo_merge_ms),
+            'max_projects': str(self.max_projects),
+            'redact_mode': self.redact_mode,
+            'redact_strength': str(self.redact_strength),
+            'scene_cut_distance': str(self.scene_cut_distance),
+            'idle_mode': self.idle_mode,
+            'idle_seconds': str(self.idle_seconds),
+            'idle_threshold': str(self.idle_threshold),
+            'idle_speed': str(self.idle_speed),
+            'idle_hold': str(self.idle_hold),
+            'clip_export': self.clip_export,
+            'hold_seconds': str(self.hold_seconds),
+            'concat_fit': self.concat_fit,
+            'sprite_trim': str(self.sprite_trim),
         }
 
         with open(config_file, 'w') as config_file:
             config.write(config_file)
 
     def _mousePressEvent(self, e):
-        self.start_point = e.position()
-        if self.start_point.x() < 0 or self.start_point.y() < 0 or self.start_point.x() > self.canvas.width() or self.start_point.y() > self.canvas.height():
+        # scene items like text inputs take the click first, select tool falls through to the view's hand drag
+        QGraphicsScene.mousePressEvent(self.scene, e)
+        if e.isAccepted() or self.current_tool == "select":
             return
+        self.start_point = e.scenePos()
+        if self.start_point.x() < 0 or self.start_point.y() < 0 or self.start_point.x() > self.canvas_width or self.start_point.y() > self.canvas_height:
+            return
+        e.accept()
         self.dragging = True
-        if self.current_tool == "select":
-            self.select_start_point = e.position()
-            QApplication.setOverrideCursor(Qt.CursorShape.ClosedHandCursor)
         if self.current_tool == "pen":
-            self.current_path = QPainterPath()
-            self.current_path.moveTo(self.start_point)
-            self.current_path_item = QGraphicsPathItem(self.current_path)
-            self.current_path_item.setPen(self.current_pen)
-            self.scene.addItem(self.current_path_item)
+            self.current_points = [QPointF(self.start_point)]
+            self.current_stroke_items = []
+            self.add_stroke_chunk(self.start_point)
         if self.current_tool == "line":
             self.current_line_item = QGraphicsLineItem()
             self.current_line_item.setPen(self.current_pen)
@@ -1957,57 +2905,33 @@ class DrawOver(QMainWindow):
             self.scene.addItem(self.current_ellipse_item)
         if self.current_tool == "text":
             if self.current_text_item:
-                self.setFocus()
                 self.current_text_item = None
                 return
-            text_input = QTextEdit()
-            font = text_input.currentFont()
-            font.setPointSize(self.text_size)
-            text_input.setFont(font)
-            text_input.setUndoRedoEnabled(False)
-
-            text_input.setFixedSize(60, 30 * self.text_size / 10)
-            text_input.setStyleSheet(f"QTextEdit {{background-color: rgba(255,255,255, .8); color:{self.text_color};}}")
-
-            self.current_text_item = QWidget()
-            self.current_text_item.setStyleSheet("background-color: transparent;")
-            self.current_text_item.setFixedSize(self.canvas_width, self.canvas_height)
-            text_input.setParent(self.current_text_item)
-            self.scene.addWidget(self.current_text_item)
-
-            text_input.move(self.start_point.x(), self.start_point.y())
-            text_input.setFocus()
-
-            text_input.textChanged.connect(lambda: (text_input.setFixedSize(text_input.document().idealWidth() + 20 * self.text_size / 10,
-                                                                            text_input.document().size().height() + 10 * self.text_size / 10)))
-
-            def focusOutEvent(e):
-                    text_input.setReadOnly(True)
-                    cursor = text_input.textCursor()
-                    cursor.clearSelection()
-                    text_input.setTextCursor(cursor)
-            text_input.focusOutEvent = focusOutEvent
-
-            def mousePressEvent(e):
-                self.current_text_item = text_input,
-                text_input.setReadOnly(False),
-                text_input.setFocus(),
-            text_input.mousePressEvent = mousePressEvent
-        
+            self.current_text_item = TextItem(self.text_size, self.text_color)
+            self.current_text_item.setPos(self.start_point)
+            self.scene.addItem(self.current_text_item)
+            self.current_text_item.start_editing()
+        if self.current_tool == "redact":
+            self.current_redact_item = RedactItem(QRectF(self.start_point, self.start_point), self.redact_mode, self.redact_strength)
+            self.current_redact_item.background = self.redact_background
+            self.scene.addItem(self.current_redact_item)
+
     def _mouseMoveEvent(self, e):
         if not self.dragging:
+            QGraphicsScene.mouseMoveEvent(self.scene, e)
             return
-        self.end_point = e.position()
+        self.end_point = e.scenePos()
         self.end_point.setX(min(self.canvas_width, max(0, self.end_point.x())))
         self.end_point.setY(min(self.canvas_height, max(0, self.end_point.y())))
-        if self.current_tool == "select" and self.select_start_point is not None:
-            delta = self.end_point - self.select_start_point
-            self.view.horizontalScrollBar().setValue(self.view.horizontalScrollBar().value() - delta.x())
-            self.view.verticalScrollBar().setValue(self.view.verticalScrollBar().value() - delta.y())
-            self.select_start_point = self.end_point
         if self.current_tool == "pen" and self.current_path_item is not None:
-            self.current_path.lineTo(self.end_point)
-            self.current_path_item.setPath(self.current_path)
+            # drop sub-pixel moves, they add vertices without changing the stroke
+            if QLineF(self.current_points[-1], self.end_point).length() * self.view.transform().m11() >= 1:
+                # only the last chunk of the stroke is rebuilt on every move
+                if self.current_path.elementCount() >= self.stroke_chunk_size:
+                    self.add_stroke_chunk(self.current_points[-1])
+                self.current_points.append(QPointF(self.end_point))
+                self.current_path.lineTo(self.end_point)
+                self.current_path_item.setPath(self.current_path)
         if self.current_tool == "line"  and self.current_line_item is not None:
             self.current_line_item.setLine(self.current_line_item.line().x1(), self.current_line_item.line().y1(), self.end_point.x(), self.end_point.y())
         if self.current_tool == "arrow" and self.current_arrow_line_item is not None:
@@ -2068,37 +2992,178 @@ class DrawOver(QMainWindow):
                 end_point.setX(self.start_point.x())
                 end_point.setY(self.start_point.y())
             self.current_ellipse_item.setRect(self.start_point.x(), self.start_point.y(), self.end_point.x() - self.start_point.x(), self.end_point.y() - self.start_point.y())
+        if self.current_tool == "redact" and self.current_redact_item is not None:
+            self.current_redact_item.setRect(QRectF(self.start_point, self.end_point).normalized())
     
     def _mouseReleaseEvent(self, e):
         if not self.dragging:
+            QGraphicsScene.mouseReleaseEvent(self.scene, e)
+            self.current_tool == "select" and self.commit_tracked_moves()
             return
         self.dragging = False
-        if self.current_tool == "select" and self.select_start_point is not None:
-            QApplication.restoreOverrideCursor()
-            self.select_start_point = None
         if self.current_tool == "pen" and self.current_path_item is not None:
-            self.undo_history.push(AddSceneItemCmd(self, self.current_path_item))
+            for item in self.current_stroke_items:
+                self.scene.removeItem(item)
+            path_item = QGraphicsPathItem(stroke_path(simplify(self.current_points, self.pen_tolerance), self.pen_smoothing))
+            path_item.setPen(self.current_pen)
+            self.scene.addItem(path_item)
+            self.add_item(path_item)
             self.current_path_item = None
+            self.current_stroke_items = []
         if self.current_tool == "line" and self.current_line_item is not None:
-            self.undo_history.push(AddSceneItemCmd(self, self.current_line_item))
+            self.add_item(self.current_line_item)
             self.current_line_item = None
         if self.current_tool == "arrow" and self.current_arrow_line_item is not None:
-            self.undo_history.push(AddSceneItemCmd(self, self.current_arrow_line_item))
+            self.add_item(self.current_arrow_line_item)
             self.current_arrow_line_item = None
         if self.current_tool == "double_arrow" and self.current_double_arrow_line_item is not None:
-            self.undo_history.push(AddSceneItemCmd(self, self.current_double_arrow_line_item))
+            self.add_item(self.current_double_arrow_line_item)
             self.current_double_arrow_line_item = None
         if self.current_tool == "rectangle" and self.current_rectangle_item is not None:
-            self.undo_history.push(AddSceneItemCmd(self, self.current_rectangle_item))
+            self.add_item(self.current_rectangle_item)
             self.current_rectangle_item = None
         if self.current_tool == "ellipse" and self.current_ellipse_item is not None:
-            self.undo_history.push(AddSceneItemCmd(self, self.current_ellipse_item))
+            self.add_item(self.current_ellipse_item)
             self.current_ellipse_item = None
         if self.current_tool == "text" and self.current_text_item is not None:
-            self.undo_history.push(AddSceneItemCmd(self, self.current_text_item))
+            self.add_item(self.current_text_item)
+        if self.current_tool == "redact" and self.current_redact_item is not None:
+            # a click without a drag leaves nothing to redact
+            rect = self.current_redact_item.rect()
+            if rect.width() * self.view.transform().m11() < 2 or rect.height() * self.view.transform().m11() < 2:
+                self.scene.removeItem(self.current_redact_item)
+            else:
+                self.add_item(self.current_redact_item)
+            self.current_redact_item = None
+
+    def add_stroke_chunk(self, point):
+        self.current_path = QPainterPath(point)
+        self.current_path_item = QGraphicsPathItem(self.current_path)
+        self.current_path_item.setPen(self.current_pen)
+        self.scene.addItem(self.current_path_item)
+        self.current_stroke_items.append(self.current_path_item)
+
+    def setup_item(self, item):
+        # finished annotations don't change anymore, repaint them from a cached pixmap
+        # redactions follow the frame underneath so they are never cached
+        item.setCacheMode(QGraphicsItem.CacheMode.NoCache if isinstance(item, RedactItem) else ITEM_CACHE_MODES[self.item_cache])
+        item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, self.current_tool == "select")
+        if isinstance(item, RedactItem):
+            item.background = self.redact_background
+
+    def add_item(self, item):
+        self.setup_item(item)
+        self.undo_history.push(AddSceneItemCmd(self, item))
+
+    def range_items(self):
+        return [item for item in self.scene.selectedItems() if item in self.items] or self.items[-1:]
+
+    def set_item_in(self):
+        items = self.range_items()
+        if items:
+            last = max((frame_range(item) or (0, self.frame_count - 1))[1] for item in items)
+            self.undo_history.push(SetFrameRangeCmd(self, items, (self.current_frame, max(self.current_frame, last))))
+
+    def set_item_out(self):
+        items = self.range_items()
+        if items:
+            first = min((frame_range(item) or (0, self.frame_count - 1))[0] for item in items)
+            self.undo_history.push(SetFrameRangeCmd(self, items, (min(first, self.current_frame), self.current_frame)))
+
+    def reset_item_range(self):
+        items = self.range_items()
+        items and self.undo_history.push(SetFrameRangeCmd(self, items, None))
+
+    def update_item_ranges(self, frame=None):
+        # annotations that are not on the current frame are ghosted, they stay pickable to edit their range
+        frame = self.current_frame if frame is None else frame
+        for item in self.items:
+            item.setOpacity(1 if not self.is_sequence or is_active(item, frame) else .25)
+            if isinstance(item, RedactItem) and item.keyframes:
+                item.setPos(item.offset_at(frame))
+                item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, self.current_tool == "select")
+
+        # the frames where ranges start or end past their last frame, a frame change only touches what changes there
+        at = {}
+        for item in self.items:
+            first_last = frame_range(item)
+            if first_last:
+                for bound in (first_last[0], first_last[1] + 1):
+                    at.setdefault(bound, []).append(item)
+        self.item_transitions = {
+            "items": self.items,
+            "count": len(self.items),
+            "bounds": sorted(at),
+            "at": at,
+            "moving": [item for item in self.items if isinstance(item, RedactItem) and item.keyframes],
+            "frame": frame,
+        }
+
+    def step_item_ranges(self, frame):
+        """update_item_ranges for a frame change during playback or scrubbing, only annotations whose range starts or ends
+        between the two frames and redactions that move are updated."""
+        transitions = self.item_transitions
+        # edits to ranges and keyframes update all items, added or removed ones are caught here
+        if not self.is_sequence or transitions is None or transitions["items"] is not self.items or transitions["count"] != len(self.items):
+            self.update_item_ranges(frame)
+            return
+        low, high = sorted((transitions["frame"], frame))
+        bounds = transitions["bounds"]
+        changed = {item for bound in bounds[bisect_right(bounds, low):bisect_right(bounds, high)] for item in transitions["at"][bound]}
+        for item in changed:
+            item.setOpacity(1 if is_active(item, frame) else .25)
+        for item in transitions["moving"]:
+            item.setPos(item.offset_at(frame))
+        transitions["frame"] = frame
+
+    def track_item(self):
+        # the selected redaction or the last one drawn, tracked from the current frame through its frame range
+        items = [item for item in self.scene.selectedItems() if isinstance(item, RedactItem) and item in self.items] or [item for item in self.items if isinstance(item, RedactItem)][-1:]
+        if not self.is_sequence or not items or self.tracker:
+            return
+        item = items[-1]
+        first, last = frame_range(item) or (self.slider.minimum(), self.slider.maximum())
+        first, last = max(0, first), min(self.frame_count - 1, last)
+        anchor = min(max(self.current_frame, first), last)
+        self.tracked_item = (item, item.offset_at(anchor))
+        self.tracker = RegionTracker({frame: self.frame_path(frame) for frame in range(first, last + 1)}, anchor, item.image_rect(self.image_width / self.canvas_width, anchor), self.frame_cache)
+        self.tracker.progress_signal.connect(self.tracking_progress)
+        self.tracker.tracked_signal.connect(self.tracking_done)
+        self.tracker.start()
+
+    def tracking_progress(self, percent):
+        self.track_button.setText(f"{percent}%")
+
+    def tracking_done(self, offsets):
+        self.tracker.wait()
+        self.tracker = None
+        self.track_button.setText("Track")
+        item, origin = self.tracked_item
+        if item not in self.items or not offsets:
+            return
+        # every tracked frame becomes a keyframe, offsets come back in image pixels
+        scale = self.canvas_width / self.image_width
+        keyframes = {frame: (origin.x() + dx * scale, origin.y() + dy * scale) for frame, (dx, dy) in offsets.items()}
+        self.undo_history.push(SetKeyframesCmd(self, item, keyframes))
+
+    def commit_tracked_moves(self):
+        # a tracked redaction dragged with the select tool is corrected on the current frame only
+        for item in self.scene.selectedItems():
+            if isinstance(item, RedactItem) and item.keyframes and item in self.items and item.pos() != item.offset_at(self.current_frame):
+                keyframes = dict(item.keyframes)
+                keyframes[self.current_frame] = (item.pos().x(), item.pos().y())
+                self.undo_history.push(SetKeyframesCmd(self, item, keyframes))
 
     def closeEvent(self, event):
-        self.is_sequence and self.timeline.stop()
+        self.is_sequence and self.playback.pause()
+        self.frame_prefetcher.stop()
+        self.proxy_builder and self.proxy_builder.stop()
+        self.tracker and self.tracker.stop()
+        self.crop_analyzer and self.crop_analyzer.wait()
+        self.idle_analyzer and self.idle_analyzer.wait()
+        self.scene_indexer and self.scene_indexer.stop()
+        logger.info(f"Frame cache: {self.frame_cache.stats()}")
+        self.close_project()
         self.save_settings()
         # check if self has self.try_lock_thread.terminate()
         self.try_lock_thread and self.try_lock_thread.terminate()
@@ -2138,7 +3203,7 @@ class Capturer(QThread):
     recording_done_signal = Signal(str)
     encoding_done_signal = Signal(str)
     decoding_done_signal = Signal(str)
-    screenshot_done_signal = Signal(str)
+    screenshot_done_signal = Signal(QImage, str)
     countdown_signal = Signal(int)
     run_timer_signal = Signal(int)
     capture_stopped_signal = Signal()
@@ -2183,6 +3248,11 @@ class Capturer(QThread):
         self.progress_range = (0, 100)
         self.active_screen = None
         self.i_ext = "jpg"
+        self.decode_segments = os.cpu_count() or 1
+        self.min_segment_frames = 120
+        self.auto_pause = 0 # seconds without any change on screen before frames stop being written, 0 = never
+        self.preroll = .5 # seconds of still frames written before the recording resumes
+        self.pauses = [] # [frame, seconds] of every auto pause in the last recording
 
     def run(self):
         self.halt = False
@@ -2200,10 +3270,36 @@ class Capturer(QThread):
             self.start_capture_time = time.time()
             period = 1.0/self.fps
             seconds = 0
+            self.pauses = []
+            paused_at, paused_time = None, 0
+            idle_since, last_signature, last_cursor = time.time(), None, None
+            preroll = deque(maxlen=max(1, round(self.preroll * self.fps)))
             while not self.halt:
                 st = time.time()
-                self.screenshot_md(self.capture_count)
-                self.capture_count += 1
+                image = self.grab_md()
+                if self.auto_pause > 0:
+                    signature, cursor = frame_signature(image), QCursor.pos()
+                    if cursor != last_cursor or frames_differ(signature, last_signature):
+                        idle_since = st
+                    last_signature, last_cursor = signature, cursor
+                    if paused_at is None and st - idle_since >= self.auto_pause:
+                        # the last written frame stays on screen for the whole pause
+                        paused_at = st
+                    elif paused_at is not None and idle_since == st:
+                        # the pre-roll stands in for the end of the pause
+                        held = max(0, st - paused_at - len(preroll) * period)
+                        self.pauses.append([self.capture_count, round(held, 3)])
+                        paused_time += held
+                        paused_at = None
+                        for still in preroll:
+                            self.save_image(still, self.frame_file(self.capture_count))
+                            self.capture_count += 1
+                        preroll.clear()
+                    if paused_at is not None:
+                        preroll.append(image)
+                if paused_at is None:
+                    self.save_image(image, self.frame_file(self.capture_count))
+                    self.capture_count += 1
                 td = time.time()-st
                 wait = period-td
                 if(wait>0):time.sleep(wait)
@@ -2215,19 +3311,25 @@ class Capturer(QThread):
                     self.halt = True
 
             self.stop_capture_time = time.time()
-            self.true_fps = math.ceil((float(self.capture_count) / (self.stop_capture_time-self.start_capture_time)))
+            if paused_at is not None:
+                paused_time += self.stop_capture_time - paused_at
+                self.pauses.append([self.capture_count, round(self.stop_capture_time - paused_at, 3)])
+            # paused time produced no frames, it doesn't count towards the frame rate
+            self.true_fps = math.ceil((float(self.capture_count) / max(period, self.stop_capture_time - self.start_capture_time - paused_time)))
+            self.save_timeline()
             self.recording_done_signal.emit(self.current_cache_folder)
         elif self.mode == "encode":
             self.progress_signal.emit("0")
             self.progress_range = (0, 100)
-            if self.encode_options and self.encode_options["drawover_image_path"]:
-                self.progress_range = (0, 50)
-                self.video_drawover()
-                self.progress_range = (50, 100)
-            video_file = self.encode_video()
+            if self.encode_options and self.encode_options.get("sprite_sheet"):
+                video_file = self.encode_sprites()
+            elif self.encode_options and self.v_ext in ANIMATED_FORMATS:
+                video_file = self.encode_animation()
+            else:
+                video_file = self.encode_video()
             self.encoding_done_signal.emit(video_file)
         elif self.mode == "decode":
-            self.clear_cache_files()
+            "folder" not in self.decode_options and self.clear_cache_files()
             self.progress_signal.emit("0")
             self.progress_range = (0, 100)
             output = self.decode_video()
@@ -2241,8 +3343,11 @@ class Capturer(QThread):
                 return
             self.fullscreen and self.hide_app_signal.emit()
             time.sleep(.2) # give app time to hide
-            filepath = self.screenshot_md(None, self.i_ext)
-            self.screenshot_done_signal.emit(filepath)
+            image = self.grab_md()
+            filepath = f'{self.current_cache_folder}/peek_{self.UID}.{self.i_ext}'
+            self.screenshot_done_signal.emit(image, filepath)
+            # the editor already has the image, the cache copy is only written for crash safety
+            self.save_image(image, filepath)
 
         self.quit()
     
@@ -2268,23 +3373,51 @@ class Capturer(QThread):
         return True
 
     def record(self):
+        self.use_cache_folder()
         self.mode = "record"
         self.start()
     
     def decode(self, decode_options):
+        # appended videos are decoded into a folder of their own, the frames being edited stay where they are
+        "folder" not in decode_options and self.use_cache_folder()
         self.mode = "decode"
         self.decode_options = decode_options
         self.start()
     
     def decode_video(self):
-        os.makedirs(self.current_cache_folder, exist_ok=True)
+        folder = self.decode_options.get("folder", self.current_cache_folder)
+        os.makedirs(folder, exist_ok=True)
         image_path = self.decode_options["image_path"]
-        nb_frames, duration = self.get_video_info(image_path)
-        self.true_fps = math.ceil((float(nb_frames) / duration))
-
-        systemcall = ['ffmpeg', '-i', image_path, '-start_number', '0', "-qscale:v", "2", f'{self.current_cache_folder}/peek_{self.UID}_%06d.jpg', "-progress", "pipe:1"]
-
         try:
+            # ffprobe comes with ffmpeg, which may not be installed
+            nb_frames, duration = self.get_video_info(image_path)
+        except Exception as e:
+            logger.error(e)
+            return None
+        if "folder" in self.decode_options:
+            self.save_timeline(folder, {"fps": nb_frames / duration})
+        else:
+            self.true_fps = math.ceil((float(nb_frames) / duration))
+
+        # split the video by time and decode segments concurrently, each segment numbers its own frames
+        segments = Capturer.split_segments(nb_frames, duration, self.decode_segments, self.min_segment_frames)
+        decoded = [0] * len(segments)
+        lock = threading.Lock()
+        last_percent = [-1]
+
+        def decode_segment(index):
+            start, length = segments[index]
+            systemcall = ['ffmpeg']
+            if start > 0:
+                systemcall += ['-ss', f'{start:.6f}']
+            systemcall += ['-i', image_path]
+            # segments are bounded by time, frame counts can't be trusted on variable frame rate sources
+            # and adjacent segments would decode the frames around their boundary twice
+            if length is not None:
+                systemcall += ['-t', f'{length:.6f}']
+            # frames are written as they are, not duplicated or dropped to a constant rate
+            systemcall += ['-vsync', 'passthrough', "-qscale:v", "2", f'{folder}/peek_{self.UID}_s{index:03d}_%06d.jpg', "-progress", "pipe:1"]
+
             # Shell is True on windows, otherwise the terminal window pops up on Windows app
             process = subprocess.Popen(systemcall, shell=sys.platform == "win32", stdout=subprocess.PIPE, stderr=subprocess.STDOUT, encoding='utf-8', errors='replace')
             while True:
@@ -2292,20 +3425,47 @@ class Capturer(QThread):
                 if realtime_output == '' and process.poll() is not None:
                     if process.returncode != 0:
                         logger.error(f"ffmpeg returned {process.returncode}")
-                        return None
-                    break
+                        return False
+                    return True
                 if realtime_output:
                     if "frame=" in realtime_output:
                         frame = realtime_output.split("frame=")[1].split(" ")[0]
                         if frame:
-                            percent = math.ceil(Capturer.map_range(int(frame), 0, nb_frames, 0, 100))
-                            self.progress_signal.emit(f"{percent}")
+                            with lock:
+                                decoded[index] = int(frame)
+                                percent = math.ceil(Capturer.map_range(sum(decoded), 0, nb_frames, 0, 100))
+                                if percent != last_percent[0]:
+                                    last_percent[0] = percent
+                                    self.progress_signal.emit(f"{percent}")
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                results = list(executor.map(decode_segment, range(len(segments))))
+            if not all(results):
+                return None
+            Capturer.compact_frames(folder, f'peek_{self.UID}_')
         except Exception as e:
             logger.error(e)
             return None
 
-        return self.current_cache_folder
-    
+        return folder
+
+    @staticmethod
+    def split_segments(nb_frames, duration, max_segments, min_segment_frames):
+        """(start, length) in seconds of every segment, the last one runs to the end and has no length."""
+        count = max(1, min(max_segments, nb_frames // max(1, min_segment_frames)))
+        bounds = [i * duration / count for i in range(count)]
+        return [(bounds[i], bounds[i + 1] - bounds[i] if i + 1 < count else None) for i in range(count)]
+
+    @staticmethod
+    def compact_frames(folder, prefix):
+        # every segment numbers its frames from 1, they are numbered in order across segments
+        filenames = sorted(f for f in os.listdir(folder) if f.startswith(prefix) and f.endswith(".jpg"))
+        for i, filename in enumerate(filenames):
+            new_filename = f'{prefix}{i:06d}.jpg'
+            if filename != new_filename:
+                os.rename(os.path.join(folder, filename), os.path.join(folder, new_filename))
+
     def get_video_info(self, filename):
         result = subprocess.run(
             [
@@ -2326,6 +3486,9 @@ class Capturer(QThread):
         duration = float(ffprobe_out.split("duration=")[1].split("\n")[0])
         return nb_frames, duration
     
+    def has_ffmpeg(self):
+        return shutil.which(self.ffmpeg_bin) is not None
+
     def encode(self, encode_options=None):
         self.mode = "encode"
         self.encode_options = encode_options
@@ -2337,20 +3500,47 @@ class Capturer(QThread):
         if self.encode_options and self.encode_options["drawover_range"]:
             start_number = self.encode_options["drawover_range"][0]
             vframes = self.encode_options["drawover_range"][1] - self.encode_options["drawover_range"][0]
+        overlays = self.encode_options["drawover_overlays"] if self.encode_options else None
+        redactions = self.encode_options["drawover_redactions"] if self.encode_options else None
+        # an explicit frame list leaves out idle or time-lapsed frames, only the kept ones are piped
+        frames = self.encode_options["frames"] if self.encode_options else None
+        if frames:
+            vframes = len(frames)
+        clips = self.encode_options["clips"] if self.encode_options else None
+        crop = self.encode_options["crop"] if self.encode_options else None
+        paths = self.encode_options["frame_paths"] if self.encode_options else None
+        size = self.encode_options["frame_size"] if self.encode_options else None
+        fit = self.encode_options["fit"] if self.encode_options else "pad"
+        composited = bool(overlays or redactions or frames or clips or paths)
         fprefix = (f'{self.current_cache_folder}/peek_{self.UID}_')
-        vidfile = f"{self.current_cache_folder}/peek_{self.UID}.{self.v_ext}"
+        vidfile = f"{self.export_folder()}/peek_{self.UID}.{self.v_ext}"
+
+        if clips:
+            # the clips are piped back to back once, ffmpeg trims them into a file each in a folder
+            vidfile = f"{self.export_folder()}/peek_{self.UID}_clips"
+            shutil.rmtree(vidfile, ignore_errors=True)
+            os.makedirs(vidfile)
+            outputs = [os.path.join(vidfile, clip_filename(i, name, self.v_ext)) for i, (name, _) in enumerate(clips)]
+            output_flags = self.clip_flags(self.ffmpeg_flags[self.v_ext + self.quality], crop, [count for _, count in clips], outputs)
+        else:
+            output_flags = ["-vframes", str(vframes), *self.crop_flags(self.ffmpeg_flags[self.v_ext + self.quality], crop), str(vidfile)]
 
+        # annotated frames are composited in memory and piped, the frame store itself is never rewritten
+        frame_input = ["-f", "image2pipe", "-c:v", "mjpeg", "-i", "pipe:0"] if composited else ["-start_number", str(start_number), "-i", str(fprefix)+"%"+str(self.fmt)+".jpg"]
         systemcall = [str(self.ffmpeg_bin), "-r", str(self.true_fps), "-y",
-                      "-start_number", str(start_number),
-                      "-i", str(fprefix)+"%"+str(self.fmt)+".jpg",
-                      "-vframes", str(vframes),
-                      *self.ffmpeg_flags[self.v_ext + self.quality],
-                      str(vidfile),
+                      *frame_input,
+                      *output_flags,
                       "-progress", "pipe:1"]
 
         try:
             # Shell is True on windows, otherwise the terminal window pops up on Windows app
-            process = subprocess.Popen(systemcall, shell=sys.platform == "win32", stdout=subprocess.PIPE, stderr=subprocess.STDOUT, encoding='utf-8', errors='replace')
+            process = subprocess.Popen(systemcall, shell=sys.platform == "win32", stdin=subprocess.PIPE if composited else None, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, encoding='utf-8', errors='replace')
+            writer = None
+            # every clip output counts its own frames, progress follows the piped frames instead
+            progress = (lambda count: self.progress_signal.emit(f"{math.ceil(Capturer.map_range(count, 0, vframes, *self.progress_range))}")) if clips else None
+            if composited:
+                writer = threading.Thread(target=self.video_drawover, args=(process.stdin.buffer, fprefix, frames or range(start_number, start_number + vframes), overlays, redactions, progress, paths, size, fit), daemon=True)
+                writer.start()
             while True:
                 realtime_output = process.stdout.readline()
                 if realtime_output == '' and process.poll() is not None:
@@ -2358,56 +3548,216 @@ class Capturer(QThread):
                         vidfile = None
                         logger.error(f"ffmpeg returned {process.returncode}")
                     break
-                if realtime_output:
+                if realtime_output and not clips:
                     if "frame=" in realtime_output:
                         frame = realtime_output.split("frame=")[1].split(" ")[0]
                         if frame:
                             percent = math.ceil(Capturer.map_range(int(frame), 0, vframes, self.progress_range[0], self.progress_range[1]))
                             self.progress_signal.emit(f"{percent}")
+            writer and writer.join()
         except Exception as e:
             logger.error(e)
             vidfile = None
 
         return vidfile
     
-    def video_drawover(self):
-        drawover_pixmap = QPixmap(self.encode_options["drawover_image_path"])
-        pos = QPoint()
-        rng = self.encode_options["drawover_range"] or (0, self.capture_count)
-        start_time = time.time()
-        for i in range(*rng):
-            filename = f'{self.current_cache_folder}/peek_{self.UID}_{str(i).zfill(6)}.jpg'
-            pixmap = QPixmap(filename)
-            painter = QPainter(pixmap)
-            painter.setRenderHint(QPainter.Antialiasing,True)
-            painter.drawPixmap(pos, drawover_pixmap)
-            painter.end()
-            pixmap.save(filename, "jpg", 40 if self.quality == "md" else 100)
-            passed_time = time.time()-start_time
-            if passed_time > .3 or i == rng[1]-1 or i == rng[0]:
-                self.progress_signal.emit(f"{math.ceil(Capturer.map_range(i, rng[0], rng[1]-1, self.progress_range[0], self.progress_range[1]))}")
-                start_time = time.time()
+    @staticmethod
+    def crop_flags(flags, crop):
+        # crop runs first so palette generation and scaling only see the kept area
+        if not crop:
+            return flags
+        crop_filter = f"crop={crop.width()}:{crop.height()}:{crop.x()}:{crop.y()}"
+        if "-vf" not in flags:
+            return ["-vf", crop_filter, *flags]
+        flags = list(flags)
+        flags[flags.index("-vf") + 1] = f"{crop_filter},{flags[flags.index('-vf') + 1]}"
+        return flags
+
+    @staticmethod
+    def clip_flags(flags, crop, counts, outputs):
+        # consecutive runs of `counts` piped frames are trimmed into their own output, each with its own copy of the -vf chain
+        flags = list(flags)
+        vf = None
+        if "-vf" in flags:
+            vf = flags.pop(flags.index("-vf") + 1)
+            flags.remove("-vf")
+        crop_filter = f"crop={crop.width()}:{crop.height()}:{crop.x()}:{crop.y()}," if crop else ""
+        graph = [f"[0:v]{crop_filter}split={len(counts)}" + "".join(f"[c{i}]" for i in range(len(counts)))]
+        output_flags, start = [], 0
+        for i, (count, output) in enumerate(zip(counts, outputs)):
+            # labels inside the chain, like the gif palette ones, have to be unique in the graph
+            chain = "," + re.sub(r"\[(\w+)\]", lambda match: f"[c{i}_{match.group(1)}]", vf) if vf else ""
+            graph.append(f"[c{i}]trim=start_frame={start}:end_frame={start + count},setpts=PTS-STARTPTS{chain}[v{i}]")
+            output_flags += ["-map", f"[v{i}]", *flags, output]
+            start += count
+        return ["-filter_complex", ";".join(graph), *output_flags]
+
+    def encode_sprites(self):
+        # frames are composited like they are for a video and packed into the sheet one at a time
+        frames = self.export_frames()
+        folder = f"{self.export_folder()}/peek_{self.UID}_sprites"
+        options = self.encode_options["sprite_sheet"]
+        sheet = SpriteSheet(len(frames), folder, "sprites", options["format"], options["trim"])
+        try:
+            shutil.rmtree(folder, ignore_errors=True)
+            os.makedirs(folder)
+            for frame, duration in self.composited_frames(frames):
+                sheet.add(frame, duration)
+            sheet.save(self.true_fps)
+        except Exception as e:
+            logger.error(e)
+            return None
+        return folder
+
+    def encode_animation(self):
+        # webp and apng are written in-process, no ffmpeg to start and the writer only keeps the previous frame
+        frames = self.export_frames()
+        clips = self.encode_options["clips"]
+        ext = ANIMATED_FORMATS[self.v_ext]
+        vidfile = f"{self.export_folder()}/peek_{self.UID}.{ext}"
+        outputs, counts = [vidfile], [len(frames)]
+        try:
+            if clips:
+                vidfile = f"{self.export_folder()}/peek_{self.UID}_clips"
+                shutil.rmtree(vidfile, ignore_errors=True)
+                os.makedirs(vidfile)
+                outputs = [os.path.join(vidfile, clip_filename(i, name, ext)) for i, (name, _) in enumerate(clips)]
+                counts = [count for _, count in clips]
+            composited = self.composited_frames(frames)
+            for output, count in zip(outputs, counts):
+                with (APNGWriter(output) if self.v_ext == "apng" else WebPWriter(output, 100 if self.quality == "hi" else 75)) as writer:
+                    for frame, duration in itertools.islice(composited, count):
+                        writer.add(frame, duration)
+        except Exception as e:
+            logger.error(e)
+            return None
+        return vidfile
+
+    def export_frames(self):
+        start_number, end = self.encode_options["drawover_range"] or (0, self.capture_count)
+        return self.encode_options["frames"] or range(start_number, end)
+
+    def composited_frames(self, frames):
+        """(frame, duration in ms) of every exported frame, decoded, fitted, redacted, with its overlay and cropped."""
+        options = self.encode_options
+        overlay_at = Capturer.overlay_frames(options["drawover_overlays"])
+        redactions, paths, crop = options["drawover_redactions"] or {}, options["frame_paths"], options["crop"]
+        fprefix = f'{self.current_cache_folder}/peek_{self.UID}_'
+        period = 1000 / self.true_fps
+        for count, i in enumerate(frames):
+            if count % 10 == 0:
+                self.progress_signal.emit(f"{math.ceil(Capturer.map_range(count, 0, len(frames), *self.progress_range))}")
+            filename = paths[i] if paths else f'{fprefix}{str(i).zfill(6)}.jpg'
+            frame = self.drawover_frame(filename, redactions.get(i, ()), overlay_at.get(i), options["frame_size"], options["fit"], decode=True)
+            # durations are rounded against the running time so they don't drift
+            yield frame.copy(crop) if crop else frame, round((count + 1) * period) - round(count * period)
+
+    @staticmethod
+    def overlay_frames(overlays):
+        overlay_at = {}
+        for image, pos, start, stop in overlays or ():
+            overlay_at.update((i, (image, pos)) for i in range(start, stop))
+        return overlay_at
+
+    def drawover_frame(self, filename, redactions=(), overlay=None, size=None, fit="pad", decode=False):
+        """The frame fitted to `size`, redacted and with its overlay drawn, None if the file can be used as it is unless `decode`."""
+        reader = QImageReader(filename) if size else None
+        refit = reader is not None and (reader.size() != size or bytes(reader.format()) != b"jpeg")
+        if not (decode or refit or redactions or overlay):
+            return None
+        frame = QImage(filename)
+        if frame.isNull():
+            raise IOError(f"Can't read {filename}")
+        frame = fit_image(frame, size, fit) if refit else frame
+        return self.composite(frame, redactions, overlay)
+
+    def video_drawover(self, pipe, fprefix, frames, overlays, redactions=None, progress=None, paths=None, size=None, fit="pad"):
+        # frames without annotations go through as they are, the others are decoded once, redacted and get their overlay drawn on top
+        # with a size, frames of another size or format are fitted to it first, that's how appended sources are normalized
+        overlay_at = Capturer.overlay_frames(overlays)
+        redactions = redactions or {}
+        try:
+            for count, i in enumerate(frames):
+                if progress and count % 10 == 0:
+                    progress(count)
+                filename = paths[i] if paths else f'{fprefix}{str(i).zfill(6)}.jpg'
+                frame = self.drawover_frame(filename, redactions.get(i, ()), overlay_at.get(i), size, fit)
+                if frame is None:
+                    with open(filename, "rb") as f:
+                        pipe.write(f.read())
+                    continue
+                buffer = QBuffer()
+                buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+                frame.save(buffer, "jpg", 95)
+                pipe.write(buffer.data().data())
+        except Exception as e:
+            # ffmpeg exited early, the error is reported by encode_video
+            logger.error(e)
+        finally:
+            try:
+                pipe.close()
+            except Exception:
+                pass
     
     def screenshot(self):
+        self.use_cache_folder()
         self.UID = time.strftime("%Y%m%d-%H%M%S")
         self.capture_count = 0
         self.mode = "screenshot"
         self.start()
 
-    def screenshot_drawover(self, drawover_image_path):
-        filename = f'{self.current_cache_folder}/peek_{self.UID}.{self.i_ext}'
-        pixmap = QImage(filename)
-        drawover_pixmap = QImage(drawover_image_path)
+    def screenshot_drawover(self, image, encode_options):
+        image = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied if image.hasAlphaChannel() else QImage.Format.Format_RGB32)
+        return self.composite(image, encode_options["drawover_redactions"].get(0, ()), encode_options["drawover_image"])
 
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing,True)
-        painter.drawImage(QPoint(), drawover_pixmap)
-        painter.end()
+    @staticmethod
+    def composite(image, redactions=(), overlay=None):
+        """Redact and draw the (image, offset) overlay on top, redactions go first so annotations stay sharp."""
+        if redactions and image.depth() != 32:
+            image = image.convertToFormat(QImage.Format.Format_RGB32)
+        for rect, mode, strength in redactions:
+            redact_image(image, rect, mode, strength)
+        if overlay:
+            painter = QPainter(image)
+            painter.drawImage(overlay[1], overlay[0])
+            painter.end()
+        return image
 
-        pixmap.save(filename, self.i_ext, 60 if self.quality == "md" else 100)
-        return filename
+    def frame_file(self, capture_count):
+        return f'{self.current_cache_folder}/peek_{self.UID}_{capture_count:06d}.jpg'
+
+    def save_timeline(self, folder=None, timeline=None):
+        # timeline metadata of the recording or a decoded video, kept next to the frames
+        timeline = {"fps": self.true_fps, "pauses": self.pauses} if timeline is None else timeline
+        try:
+            with open(os.path.join(folder or self.current_cache_folder, "timeline.json"), "w") as f:
+                json.dump(timeline, f)
+        except Exception as e:
+            logger.error(e)
+
+    @staticmethod
+    def load_timeline(folder):
+        path = os.path.join(folder, "timeline.json")
+        if not os.path.isfile(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(e)
+            return {}
 
     def screenshot_md(self, capture_count=None, i_ext="jpg"):
+        file_path = (f'{self.current_cache_folder}/peek_{self.UID}.{i_ext}')
+        file_path = file_path[:-4] + f'_{capture_count:06d}.{i_ext}' if capture_count != None else file_path
+        self.save_image(self.grab_md(), file_path)
+        return file_path
+
+    def save_image(self, image, file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        image.save(file_path, os.path.splitext(file_path)[1][1:], 60 if self.quality == "md" else 100)
+
+    def grab_md(self):
         screen = self.active_screen or QGuiApplication.primaryScreen()
         screenshot = QScreen.grabWindow(screen)
         if self.show_cursor:
@@ -2419,13 +3769,7 @@ class Capturer(QThread):
         screenshot = screenshot.scaledToWidth(int(screenshot.size().width()/pr), Qt.TransformationMode.SmoothTransformation)
         if not self.fullscreen:
             screenshot = screenshot.copy(self.pos_x, self.pos_y, self.width, self.height)
-
-        os.makedirs(self.current_cache_folder, exist_ok=True)
-        file_path = (f'{self.current_cache_folder}/peek_{self.UID}.{i_ext}')
-        file_path = file_path[:-4] + f'_{capture_count:06d}.{i_ext}' if capture_count != None else file_path
-
-        screenshot.save(file_path, i_ext, 60 if self.quality == "md" else 100)
-        return file_path
+        return screenshot.toImage()
     
     def screenshot_hi(self, capture_count=None, i_ext="jpg"):
         screen = self.active_screen or QGuiApplication.primaryScreen()
@@ -2455,6 +3799,17 @@ class Capturer(QThread):
     def stop(self):
         self.halt = True
         
+    def export_folder(self):
+        # exports wait for the save dialog in the cache, a project's frame folder only ever holds its frames
+        folder = os.path.join(self.cache_dir, "exports")
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def use_cache_folder(self):
+        # frames handed over to a project are never captured into or cleared
+        if os.path.dirname(self.current_cache_folder) != self.cache_dir:
+            self.current_cache_folder = f'{self.cache_dir}/{time.strftime("%H%M%S")}'
+
     def clear_cache_files(self):
         if os.path.exists(self.current_cache_folder):
             try:
@@ -2516,9 +3871,9 @@ def _show():
     if window.needs_restart:
         _show()
 
-def _show_drawover():
+def _show_drawover(image_path=None):
     init()
-    window = DrawOver()
+    window = DrawOver(image_path)
     window.show()
     app.exec()
 
@@ -2530,7 +3885,8 @@ def show():
             print("-h, --help\t\tShow this help message")
             print("-v, --version\t\tShow version")
             print("-s, --shortcut\t\tCreate shortcut")
-            print("-d, --drawover\t\tOpen drawover tool")
+            print("-d, --drawover [FILE]\tOpen drawover tool, optionally with an image, video or project file")
+            print("-b, --bench [N]\t\tRun the annotation benchmark with N items, use QT_QPA_PLATFORM=offscreen to run headless")
             return
         if sys.argv[1] == "-v" or sys.argv[1] == "--version":
             print("pypeek v" + __version__)
@@ -2539,7 +3895,11 @@ def show():
             create_shortcut(__version__)
             return
         if sys.argv[1] == "-d" or sys.argv[1] == "--drawover":
-            _show_drawover()
+            _show_drawover(os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 else None)
+            return
+        if sys.argv[1] == "-b" or sys.argv[1] == "--bench":
+            from .bench import run_bench
+            run_bench(int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
             return
     
     _show()
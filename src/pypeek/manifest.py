@@ -0,0 +1,74 @@
+import numpy as np
+
+class FrameManifest:
+    """
+    Timeline frames as indices into the frame store. Edits return a new manifest together with the
+    timeline position every new frame came from, the frames on disk are never touched.
+    """
+
+    def __init__(self, frames):
+        self.frames = np.asarray(frames, np.int64)
+        self.frames.flags.writeable = False  # shared between manifests and undo history
+
+    @classmethod
+    def identity(cls, count):
+        return cls(np.arange(count))
+
+    @classmethod
+    def from_runs(cls, runs):
+        """Manifest from [start, length, step] runs, as saved in projects."""
+        return cls(np.concatenate([start + np.arange(length) * step for start, length, step in runs]) if runs else [])
+
+    def runs(self):
+        """[start, length, step] runs of store frames, step 1 for frames as recorded and 0 for held ones.
+        An unedited recording is a single run."""
+        runs = []
+        for frame in self.frames.tolist():
+            run = runs[-1] if runs else None
+            if run and run[1] == 1 and frame - run[0] in (0, 1):
+                run[1], run[2] = 2, frame - run[0]
+            elif run and run[1] > 1 and frame == run[0] + run[1] * run[2]:
+                run[1] += 1
+            else:
+                runs.append([frame, 1, 1])
+        return runs
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, frame):
+        return int(self.frames[frame])
+
+    def is_identity(self, count):
+        return len(self.frames) == count and bool((self.frames == np.arange(count)).all())
+
+    def positions(self, store_frames):
+        """Timeline positions that show any of the given store frames."""
+        return np.flatnonzero(np.isin(self.frames, store_frames)).tolist()
+
+    def delete(self, start, end):
+        origins = np.concatenate((np.arange(start), np.arange(end, len(self.frames))))
+        return FrameManifest(self.frames[origins]), origins
+
+    def duplicate(self, frame, count):
+        """Hold `frame` for `count` more frames."""
+        origins = np.concatenate((np.arange(frame + 1), np.full(count, frame), np.arange(frame + 1, len(self.frames))))
+        return FrameManifest(self.frames[origins]), origins
+
+    def insert(self, at, frames):
+        """Insert store frames before timeline position `at`, they come from nowhere on the old timeline (-1)."""
+        frames = np.asarray(frames, np.int64)
+        origins = np.concatenate((np.arange(at), np.full(len(frames), -1), np.arange(at, len(self.frames))))
+        return FrameManifest(np.concatenate((self.frames[:at], frames, self.frames[at:]))), origins
+
+def first_positions(origins, count):
+    """New timeline position of each of the `count` old ones, the first copy for held frames, -1 for deleted ones."""
+    first = np.full(count, -1, np.int64)
+    kept, positions = np.unique(origins, return_index=True)
+    first[kept[kept >= 0]] = positions[kept >= 0]
+    return first
+
+def remap_range(origins, first, last):
+    """[first, last] after an edit, stretched over every frame that came from it, None if all of it was deleted."""
+    positions = np.flatnonzero((origins >= first) & (origins <= last))
+    return (int(positions[0]), int(positions[-1])) if len(positions) else None
@@ -0,0 +1,87 @@
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer, Qt, Signal
+
+class PlaybackClock(QObject):
+    """
+    Wall clock driven playback. The playhead follows real time and every tick shows the newest frame
+    that is already decoded, frames that would be late are skipped instead of slowing playback down.
+    """
+    frameChanged = Signal(int)
+    stateChanged = Signal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.fps = 15
+        self.first = 0
+        self.last = 0
+        self.frame = 0
+        self.rendered = 0
+        self.dropped = 0
+        self.max_hold = 250 # ms, block on the playhead frame if nothing was ready for this long
+        self.is_ready = lambda frame: True
+        self._start_frame = 0
+        self._last_render = 0
+        self._clock = QElapsedTimer()
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+    def is_running(self):
+        return self._timer.isActive()
+
+    def play(self):
+        if self.is_running():
+            return
+        if self.frame >= self.last:
+            self.frame = self.first
+            self.frameChanged.emit(self.frame)
+        self.rendered = 0
+        self.dropped = 0
+        self._restart_clock()
+        self._timer.start(max(1, int(500 / self.fps)))
+        self.stateChanged.emit(True)
+
+    def pause(self):
+        if not self.is_running():
+            return
+        self._timer.stop()
+        self.stateChanged.emit(False)
+
+    def stop(self):
+        self.pause()
+        self.seek(self.first)
+        self.frameChanged.emit(self.frame)
+
+    def seek(self, frame):
+        self.frame = max(self.first, min(self.last, frame))
+        self.is_running() and self._restart_clock()
+
+    def set_range(self, first, last):
+        self.first = first
+        self.last = max(first, last)
+        self.seek(self.frame)
+
+    def stats(self):
+        total = self.rendered + self.dropped
+        return {"rendered": self.rendered, "dropped": self.dropped, "drop_rate": self.dropped / total if total else 0.0}
+
+    def _restart_clock(self):
+        self._start_frame = self.frame
+        self._last_render = 0
+        self._clock.restart()
+
+    def _tick(self):
+        elapsed = self._clock.elapsed()
+        target = min(self.last, self._start_frame + int(elapsed * self.fps / 1000))
+        if target > self.frame:
+            shown = next((frame for frame in range(target, self.frame, -1) if self.is_ready(frame)), None)
+            if shown is None and elapsed - self._last_render >= self.max_hold:
+                shown = target
+            if shown is not None:
+                self.dropped += shown - self.frame - 1
+                self.rendered += 1
+                self.frame = shown
+                self._last_render = elapsed
+                self.frameChanged.emit(shown)
+
+        if self.frame >= self.last:
+            self.pause()
@@ -0,0 +1,156 @@
+import os, json, logging
+
+from PySide6.QtWidgets import QGraphicsPathItem, QGraphicsLineItem, QGraphicsRectItem, QGraphicsEllipseItem, QGraphicsPolygonItem, QGraphicsItemGroup
+from PySide6.QtCore import Qt, QPointF, QRectF, QLineF
+from PySide6.QtGui import QPainterPath, QPolygonF, QPen, QBrush, QColor
+
+from .items import TextItem, RedactItem, frame_range, set_frame_range
+
+logger = logging.getLogger()
+
+PROJECT_VERSION = 1
+PROJECT_EXT = ".peek"
+
+def _points(values):
+    return [round(v, 2) for v in values]
+
+def _pen_to_dict(pen):
+    return {"color": pen.color().name(QColor.NameFormat.HexArgb), "width": pen.widthF(), "style": pen.style().value,
+            "cap": pen.capStyle().value, "join": pen.joinStyle().value}
+
+def _pen_from_dict(data):
+    return QPen(QBrush(QColor(data["color"])), data["width"], Qt.PenStyle(data["style"]), Qt.PenCapStyle(data["cap"]), Qt.PenJoinStyle(data["join"]))
+
+def _brush_to_dict(brush):
+    return {"color": brush.color().name(QColor.NameFormat.HexArgb), "style": brush.style().value}
+
+def _brush_from_dict(data):
+    return QBrush(QColor(data["color"]), Qt.BrushStyle(data["style"]))
+
+def _path_to_list(path):
+    values = []
+    for i in range(path.elementCount()):
+        element = path.elementAt(i)
+        values += (element.type.value, element.x, element.y)
+    return _points(values)
+
+def _path_from_list(values):
+    path = QPainterPath()
+    elements = [(int(values[i]), QPointF(values[i + 1], values[i + 2])) for i in range(0, len(values), 3)]
+    i = 0
+    while i < len(elements):
+        kind, point = elements[i]
+        if kind == QPainterPath.ElementType.MoveToElement.value:
+            path.moveTo(point)
+        elif kind == QPainterPath.ElementType.LineToElement.value:
+            path.lineTo(point)
+        elif kind == QPainterPath.ElementType.CurveToElement.value and i + 2 < len(elements):
+            path.cubicTo(point, elements[i + 1][1], elements[i + 2][1])
+            i += 2
+        i += 1
+    return path
+
+def item_to_dict(item):
+    """Serialize a finished annotation, groups are stored with their children."""
+    data = {"pos": _points((item.pos().x(), item.pos().y())), "rotation": item.rotation()}
+    if isinstance(item, TextItem):
+        data.update(type="text", text=item.toPlainText(), size=item.font().pointSize(), color=item.defaultTextColor().name(QColor.NameFormat.HexArgb))
+    elif isinstance(item, RedactItem):
+        rect = item.rect()
+        data.update(type="redact", rect=_points((rect.x(), rect.y(), rect.width(), rect.height())), mode=item.mode, strength=item.strength,
+                    keyframes=[[frame, *_points(pos)] for frame, pos in sorted(item.keyframes.items())])
+    elif isinstance(item, QGraphicsItemGroup):
+        data.update(type="group", children=[item_to_dict(child) for child in item.childItems()])
+    else:
+        data.update(pen=_pen_to_dict(item.pen()))
+        if isinstance(item, QGraphicsLineItem):
+            line = item.line()
+            data.update(type="line", line=_points((line.x1(), line.y1(), line.x2(), line.y2())))
+            return data
+        data.update(brush=_brush_to_dict(item.brush()))
+        if isinstance(item, QGraphicsPathItem):
+            data.update(type="path", path=_path_to_list(item.path()))
+        elif isinstance(item, (QGraphicsRectItem, QGraphicsEllipseItem)):
+            rect = item.rect()
+            data.update(type="rect" if isinstance(item, QGraphicsRectItem) else "ellipse", rect=_points((rect.x(), rect.y(), rect.width(), rect.height())))
+        elif isinstance(item, QGraphicsPolygonItem):
+            data.update(type="polygon", polygon=_points(v for point in item.polygon() for v in (point.x(), point.y())))
+        else:
+            return None
+    return data
+
+def item_from_dict(data):
+    kind = data["type"]
+    if kind == "text":
+        item = TextItem(data["size"], data["color"])
+        item.setPlainText(data["text"])
+    elif kind == "redact":
+        item = RedactItem(QRectF(*data["rect"]), data["mode"], data["strength"])
+        item.set_keyframes({frame: (x, y) for frame, x, y in data.get("keyframes", [])})
+    elif kind == "group":
+        item = QGraphicsItemGroup()
+        for child_data in data["children"]:
+            child = item_from_dict(child_data)
+            child and child.setParentItem(item)
+    elif kind == "line":
+        item = QGraphicsLineItem(QLineF(*data["line"]))
+    elif kind == "path":
+        item = QGraphicsPathItem(_path_from_list(data["path"]))
+    elif kind == "rect":
+        item = QGraphicsRectItem(QRectF(*data["rect"]))
+    elif kind == "ellipse":
+        item = QGraphicsEllipseItem(QRectF(*data["rect"]))
+    elif kind == "polygon":
+        values = data["polygon"]
+        item = QGraphicsPolygonItem(QPolygonF([QPointF(values[i], values[i + 1]) for i in range(0, len(values), 2)]))
+    else:
+        return None
+
+    "pen" in data and item.setPen(_pen_from_dict(data["pen"]))
+    "brush" in data and item.setBrush(_brush_from_dict(data["brush"]))
+    item.setPos(*data["pos"])
+    item.setRotation(data["rotation"])
+    set_frame_range(item, data.get("range"))
+    return item
+
+def load_project(project_path):
+    try:
+        with open(project_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        logger.error(e)
+        return None
+    if data.get("version", 0) > PROJECT_VERSION:
+        logger.error(f"Project {project_path} was saved by a newer version")
+        return None
+    return data
+
+class Project:
+    """An annotation project file, it references the frame store next to it and is rewritten by autosave whenever its state changed."""
+
+    def __init__(self, path):
+        self.path = path
+        self._serialized = {}  # id(item) -> (item, dict), finished shapes never change so they are serialized once, text and tracked regions can
+        self._written = None  # the json last written, playback and selection changes don't touch the file
+
+    def serialize(self, item):
+        cached = self._serialized.get(id(item))
+        if cached is None or cached[0] is not item or isinstance(item, (TextItem, RedactItem)):
+            cached = (item, item_to_dict(item))
+        return cached
+
+    def save(self, state, items):
+        serialized = {id(item): self.serialize(item) for item in items}
+        self._serialized = serialized
+        data = dict(state, version=PROJECT_VERSION, items=[dict(data, range=frame_range(item)) for item, data in serialized.values() if data])
+        text = json.dumps(data, separators=(",", ":"))
+        if text == self._written:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self.path)
+            self._written = text
+        except Exception as e:
+            logger.error(e)
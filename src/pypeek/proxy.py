@@ -0,0 +1,144 @@
+import os, json, logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PySide6.QtCore import Qt, QThread, Signal, QSize
+from PySide6.QtGui import QImage, QImageReader
+
+from .concat import fit_image
+
+logger = logging.getLogger()
+
+def proxy_size(path, width):
+    size = QImageReader(path).size()
+    if size.width() <= 0:
+        return QSize(width, width)
+    return QSize(width, max(1, round(size.height() * width / size.width())))
+
+def frame_keys(paths):
+    """Names of the frames the proxies are built from, the recording's own frames (the folder of the first one) by file
+    name and appended ones by their folder and file name, so they still match once the folders move into a project."""
+    folder = os.path.dirname(paths[0]) if paths else None
+    return [os.path.basename(path) if os.path.dirname(path) == folder else os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path)) for path in paths]
+
+def load_meta(proxy_path):
+    """{"frames": keys, "fit": fit mode of appended frames}, proxies from before frames could be appended have none,
+    they only hold the folder's own frames."""
+    try:
+        with open(os.path.splitext(proxy_path)[0] + ".json") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(e)
+        return None
+
+def load_proxies(proxy_path, paths, fit="pad"):
+    """Return the memory mapped proxy array if it exists and matches the frames and fit mode, otherwise None."""
+    if not os.path.isfile(proxy_path):
+        return None
+    try:
+        proxies = np.load(proxy_path, mmap_mode="r")
+    except Exception as e:
+        logger.error(e)
+        return None
+    if proxies.ndim != 4 or proxies.shape[0] != len(paths):
+        return None
+    meta, expected = load_meta(proxy_path), frame_keys(paths)
+    appended = any(os.sep in key for key in expected)
+    if meta is None:
+        return None if appended else proxies
+    return proxies if meta.get("frames") == expected and (not appended or meta.get("fit", "pad") == fit) else None
+
+def proxy_image(proxies, frame):
+    """Wrap a proxy frame as a QImage, the pixels are copied so the result outlives the memory map."""
+    frame_proxy = np.ascontiguousarray(proxies[frame])
+    height, width, _ = frame_proxy.shape
+    return QImage(frame_proxy.data, width, height, width * 3, QImage.Format.Format_RGB888).copy()
+
+def filmstrip_image(proxies, count, frames=None):
+    """Lay out `count` evenly spaced proxies side by side, of `frames` in that order when given."""
+    frames = np.arange(proxies.shape[0]) if frames is None else frames
+    indices = frames[np.linspace(0, len(frames) - 1, num=min(count, len(frames))).round().astype(int)]
+    strip = np.ascontiguousarray(np.concatenate(proxies[indices], axis=1))
+    height, width, _ = strip.shape
+    return QImage(strip.data, width, height, width * 3, QImage.Format.Format_RGB888).copy()
+
+class ProxyBuilder(QThread):
+    """Builds low resolution proxies of every frame into one memory mapped array next to the frame store."""
+    proxy_done_signal = Signal(str)
+
+    def __init__(self, paths, proxy_path, proxy_width=160, fit="pad"):
+        super().__init__()
+        self.paths = paths
+        self.proxy_path = proxy_path
+        self.proxy_width = proxy_width
+        self.fit = fit  # appended frames of another aspect ratio are fitted like in the viewer
+        self.halt = False
+
+    def reuse(self, proxies, keys):
+        # frames are appended to the end of a timeline, proxies of the leading frames that are already built are copied over
+        try:
+            old, meta = np.load(self.proxy_path, mmap_mode="r"), load_meta(self.proxy_path) or {}
+        except Exception:
+            return 0
+        if old.ndim != 4 or old.shape[1:] != proxies.shape[1:]:
+            return 0
+        old_keys = meta.get("frames") or [key for key in keys[:len(old)] if os.sep not in key]
+        if meta.get("fit", "pad") != self.fit:
+            # appended frames were fitted differently, only the folder's own frames carry over
+            old_keys = [key for key in old_keys if os.sep not in key]
+        count = 0
+        while count < min(len(old), len(old_keys), len(keys)) and old_keys[count] == keys[count]:
+            count += 1
+        proxies[:count] = old[:count]
+        return count
+
+    def run(self):
+        if load_proxies(self.proxy_path, self.paths, self.fit) is not None:
+            self.proxy_done_signal.emit(self.proxy_path)
+            return
+
+        size = proxy_size(self.paths[0], self.proxy_width)
+        tmp_path = self.proxy_path + ".tmp.npy"
+        keys = frame_keys(self.paths)
+        try:
+            proxies = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=(len(self.paths), size.height(), size.width(), 3))
+            built = self.reuse(proxies, keys)
+
+            def build(index):
+                if self.halt:
+                    return
+                reader = QImageReader(self.paths[index])
+                scaled = reader.size().scaled(size, Qt.AspectRatioMode.KeepAspectRatio) if self.fit == "pad" and reader.size().isValid() else size
+                # within a pixel it's the same aspect ratio, rounding shouldn't add a black line
+                if abs(scaled.width() - size.width()) <= 1 and abs(scaled.height() - size.height()) <= 1:
+                    scaled = size
+                reader.setScaledSize(scaled)
+                image = reader.read()
+                if image.isNull():
+                    return
+                image = fit_image(image, size, self.fit).convertToFormat(QImage.Format.Format_RGB888)
+                pixels = np.frombuffer(image.constBits(), np.uint8).reshape(image.height(), image.bytesPerLine())
+                proxies[index] = pixels[:, :image.width() * 3].reshape(image.height(), image.width(), 3)
+
+            with ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as executor:
+                list(executor.map(build, range(built, len(self.paths))))
+
+            proxies.flush()
+            del proxies
+            if self.halt:
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, self.proxy_path)
+            with open(os.path.splitext(self.proxy_path)[0] + ".json", "w") as f:
+                json.dump({"frames": keys, "fit": self.fit}, f)
+        except Exception as e:
+            logger.error(e)
+            return
+
+        self.proxy_done_signal.emit(self.proxy_path)
+
+    def stop(self):
+        self.halt = True
+        self.wait()
@@ -9,7 +9,7 @@ from PySide6.QtGui import *
 
 _fromUtf8 = lambda s: s
 
-__all__ = ['QRangeSlider']
+__all__ = ['QRangeSlider', 'QMarkerSlider']
 
 DEFAULT_CSS ="""
 QRangeSlider * {
@@ -216,6 +216,35 @@ class Handle(Element):
             self.main.setRange(s, e)
 
 
+class QMarkerSlider(QSlider):
+    """QSlider that draws (value, color) marks along its groove."""
+
+    def markers(self):
+        """:return: list of (value, color) marks"""
+        return getattr(self, '__markers', [])
+
+    def setMarkers(self, markers):
+        """sets (value, color) marks drawn as thin lines along the groove, an empty list to clear"""
+        setattr(self, '__markers', list(markers))
+        self.update()
+
+    def paintEvent(self, event):
+        """overrides paint event to draw the markers over the groove"""
+        super(QMarkerSlider, self).paintEvent(event)
+        markers = self.markers()
+        if not markers:
+            return
+        opt = QStyleOptionSlider()
+        self.initStyleOption(opt)
+        groove = self.style().subControlRect(QStyle.ComplexControl.CC_Slider, opt, QStyle.SubControl.SC_SliderGroove, self)
+        handle = self.style().subControlRect(QStyle.ComplexControl.CC_Slider, opt, QStyle.SubControl.SC_SliderHandle, self)
+        span = groove.width() - handle.width()
+        qp = QPainter(self)
+        for value, color in markers:
+            x = groove.x() + handle.width() // 2 + QStyle.sliderPositionFromValue(self.minimum(), self.maximum(), value, span)
+            qp.fillRect(QRect(x - 1, groove.center().y() - 5, 2, 10), QColor(color))
+        qp.end()
+
 class QRangeSlider(QWidget, Ui_Form):
     """
     The QRangeSlider class implements a horizontal range slider widget.
@@ -339,6 +368,7 @@ class QRangeSlider(QWidget, Ui_Form):
         self.setStart(0)
         self.setEnd(99)
         self.setDrawValues(True)
+        self.setFilmstrip(None)
 
     def min(self):
         """:return: minimum value"""
@@ -372,6 +402,7 @@ class QRangeSlider(QWidget, Ui_Form):
         """stores the start value only"""
         setattr(self, '__start', value)
         self.startValueChanged.emit(value)
+        self.update()
     
     def setStart(self, value):
         """sets the range slider start value"""
@@ -386,6 +417,7 @@ class QRangeSlider(QWidget, Ui_Form):
         """stores the end value only"""
         setattr(self, '__end', value)
         self.endValueChanged.emit(value)
+        self.update()
     
     def setEnd(self, value):
         """set the range slider end value"""
@@ -430,6 +462,57 @@ class QRangeSlider(QWidget, Ui_Form):
         if s >= self.min() and e <= self.max():
             self.setRange(s, e)
 
+    def filmstrip(self):
+        """:return: pixmap drawn behind the range handles"""
+        return getattr(self, '__filmstrip', None)
+
+    def setFilmstrip(self, pixmap):
+        """sets the pixmap drawn behind the range handles, None to clear"""
+        setattr(self, '__filmstrip', pixmap)
+        self.update()
+
+    def markers(self):
+        """:return: list of (value, color) marks drawn over the slider"""
+        return getattr(self, '__markers', [])
+
+    def setMarkers(self, markers):
+        """sets (value, color) marks drawn as thin lines over the slider, an empty list to clear"""
+        setattr(self, '__markers', list(markers))
+        self.update()
+
+    def bands(self):
+        """:return: list of (start, end, color) bands drawn under the slider"""
+        return getattr(self, '__bands', [])
+
+    def setBands(self, bands):
+        """sets (start, end, color) bands drawn as tinted stripes along the bottom of the slider, an empty list to clear"""
+        setattr(self, '__bands', list(bands))
+        self.update()
+
+    def paintEvent(self, event):
+        """overrides paint event to draw the filmstrip behind the handles, the bands and the markers"""
+        pixmap = self.filmstrip()
+        markers = self.markers()
+        bands = self.bands()
+        if pixmap is None and not markers and not bands:
+            return
+        qp = QPainter(self)
+        qp.setRenderHint(QPainter.SmoothPixmapTransform, True)
+        rect = QRect(6, 4, self.width() - 12, self.height() - 4)
+        if pixmap is not None:
+            qp.drawPixmap(rect, pixmap)
+            # dim the trimmed out parts
+            start, end = self._valueToPos(self.start()) + 6, self._valueToPos(self.end()) + 6
+            qp.fillRect(QRect(rect.left(), rect.top(), start - rect.left(), rect.height()), QColor(0, 0, 0, 160))
+            qp.fillRect(QRect(end, rect.top(), rect.right() - end, rect.height()), QColor(0, 0, 0, 160))
+        for start, end, color in bands:
+            x0, x1 = int(self._valueToPos(start)) + 6, int(self._valueToPos(end)) + 6
+            qp.fillRect(QRect(x0, rect.bottom() - 3, max(2, x1 - x0), 4), QColor(color))
+        for value, color in markers:
+            x = int(self._valueToPos(value)) + 6
+            qp.fillRect(QRect(x - 1, rect.top(), 2, rect.height()), QColor(color))
+        qp.end()
+
     def setBackgroundStyle(self, style):
         """sets background style"""
         self._tail.setStyleSheet(style)
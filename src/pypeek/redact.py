@@ -0,0 +1,51 @@
+import numpy as np
+from PySide6.QtGui import QImage
+
+REDACT_MODES = ("pixelate", "blur")
+
+def image_array(image):
+    """Writable HxWx4 view of a 32 bit QImage, no copy."""
+    pixels = np.frombuffer(image.bits(), np.uint8).reshape(image.height(), image.bytesPerLine())
+    return pixels[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+
+def pixelate(pixels, block):
+    """Replace every block x block cell with its mean, cells on the right and bottom edges may be smaller."""
+    h, w = pixels.shape[:2]
+    rows, cols = np.arange(0, h, block), np.arange(0, w, block)
+    row_sizes, col_sizes = np.diff(np.append(rows, h)), np.diff(np.append(cols, w))
+    sums = np.add.reduceat(np.add.reduceat(pixels.astype(np.uint32), rows, axis=0), cols, axis=1)
+    means = (sums // (row_sizes[:, None, None] * col_sizes[None, :, None])).astype(np.uint8)
+    return np.repeat(np.repeat(means, row_sizes, axis=0), col_sizes, axis=1)
+
+def _box(pixels, radius, axis):
+    n = pixels.shape[axis]
+    pad = [(0, 0)] * pixels.ndim
+    pad[axis] = (radius + 1, radius)
+    sums = np.cumsum(np.pad(pixels, pad, mode="edge"), axis=axis, dtype=np.uint32)
+    window = np.take(sums, np.arange(2 * radius + 1, 2 * radius + 1 + n), axis=axis) - np.take(sums, np.arange(n), axis=axis)
+    return (window // (2 * radius + 1)).astype(np.uint8)
+
+def box_blur(pixels, radius):
+    """Separable box blur from running sums, two passes per axis so it looks close to a gaussian."""
+    for _ in range(2):
+        pixels = _box(_box(pixels, radius, 0), radius, 1)
+    return pixels
+
+def redact(pixels, mode, strength):
+    strength = max(1, int(strength))
+    return pixelate(pixels, strength) if mode == "pixelate" else box_blur(pixels, strength)
+
+def redact_image(image, rect, mode, strength):
+    """Blur or pixelate `rect` of a 32 bit image in place."""
+    rect = rect & image.rect()
+    if rect.isEmpty():
+        return
+    pixels = image_array(image)[rect.top():rect.bottom() + 1, rect.left():rect.right() + 1]
+    pixels[...] = redact(pixels, mode, strength)
+
+def redacted_tile(image, rect, mode, strength):
+    """Redacted copy of `rect` of the image, used for the editor preview."""
+    tile = image.copy(rect & image.rect()).convertToFormat(QImage.Format.Format_RGB32)
+    if not tile.isNull():
+        redact_image(tile, tile.rect(), mode, strength)
+    return tile
@@ -0,0 +1,81 @@
+import os, logging
+
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+logger = logging.getLogger()
+
+def _area_mean(values, count, axis):
+    """Means of `count` about equal bins along `axis`, bins differ by a pixel when the size doesn't divide."""
+    edges = np.linspace(0, values.shape[axis], count + 1).astype(int)
+    widths = np.maximum(np.diff(edges), 1).astype(np.float32)
+    shape = [1] * values.ndim
+    shape[axis] = count
+    return np.add.reduceat(values, edges[:-1], axis=axis) / widths.reshape(shape)
+
+def dhash(frames):
+    """64 bit difference hashes of a (n, h, w, 3) uint8 block of frames: 9x8 area averaged grayscale, one bit per horizontal gradient."""
+    gray = frames.astype(np.float32) @ np.array([.299, .587, .114], np.float32)
+    small = _area_mean(_area_mean(gray, 8, 1), 9, 2)
+    bits = small[:, :, 1:] > small[:, :, :-1]
+    return np.packbits(bits.reshape(len(frames), 64), axis=1).view(">u8").ravel().astype(np.uint64)
+
+def hamming(a, b):
+    """Bit distance between two arrays of hashes."""
+    return np.unpackbits(np.bitwise_xor(a, b).view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+def scene_cuts(hashes, distance=10):
+    """Frames whose hash is at least `distance` bits away from the previous frame's."""
+    if len(hashes) < 2:
+        return []
+    return (np.flatnonzero(hamming(hashes[1:], hashes[:-1]) >= distance) + 1).tolist()
+
+def load_index(index_path, frame_count, source_path=None):
+    """Return the hashes if the index exists and matches the frame store, otherwise None.
+    The index is stale once `source_path`, the proxies it was hashed from, were rebuilt after it."""
+    if not os.path.isfile(index_path):
+        return None
+    if source_path and os.path.isfile(source_path) and os.path.getmtime(source_path) > os.path.getmtime(index_path):
+        return None
+    try:
+        hashes = np.load(index_path)
+    except Exception as e:
+        logger.error(e)
+        return None
+    return hashes if hashes.ndim == 1 and hashes.shape[0] == frame_count else None
+
+class SceneIndexer(QThread):
+    """Hashes every frame from the proxies into a small index next to the frame store, reused once it exists."""
+    index_done_signal = Signal(str)
+
+    def __init__(self, proxies, index_path, proxy_path=None, chunk=256):
+        super().__init__()
+        self.proxies = proxies
+        self.index_path = index_path
+        self.proxy_path = proxy_path
+        self.chunk = chunk
+        self.halt = False
+
+    def run(self):
+        if load_index(self.index_path, self.proxies.shape[0], self.proxy_path) is not None:
+            self.index_done_signal.emit(self.index_path)
+            return
+
+        hashes = np.zeros(self.proxies.shape[0], np.uint64)
+        try:
+            # streamed a chunk at a time, the memory mapped proxies are never loaded whole
+            for start in range(0, len(hashes), self.chunk):
+                if self.halt:
+                    return
+                hashes[start:start + self.chunk] = dhash(np.asarray(self.proxies[start:start + self.chunk]))
+            tmp_path = self.index_path + ".tmp.npy"
+            np.save(tmp_path, hashes)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.error(e)
+            return
+        self.index_done_signal.emit(self.index_path)
+
+    def stop(self):
+        self.halt = True
+        self.wait()
@@ -0,0 +1,127 @@
+import os, math, json, hashlib
+
+import numpy as np
+from PySide6.QtGui import QImage
+
+from .track import bgra_array
+
+SPRITE_FORMATS = ("png", "webp")
+
+class SpriteSheet:
+    """
+    Packs frames into sheets of at most `max_size` pixels a side while they are added. A sheet is written to `folder`
+    as soon as the next one is started, only the sheet being filled is kept in memory. Identical frames are stored once. With `trim`, frames only keep the box of pixels that differ from the first frame,
+    they are marked with "base": 0 and players draw them over that frame at their spriteSourceSize offset.
+    """
+
+    def __init__(self, count, folder, name="sprites", fmt="png", trim=False, max_size=4096):
+        self.count = count  # expected frames, the sheet is laid out about square for them
+        self.folder = folder
+        self.name = name
+        self.fmt = fmt
+        self.trim = trim
+        self.max_size = max_size
+        self.page = None  # BGRA array of the sheet being filled, grown a shelf at a time
+        self.height = 0  # its used rows
+        self.images = []  # file names of the sheets written so far
+        self.sizes = []  # and their sizes
+        self.sprites = {}  # digest -> index in rects
+        self.rects = []  # (page, x, y, w, h, left, top)
+        self.frames = []  # [sprite, duration] per run of identical frames
+        self.key = None
+        self.shelf = None  # (x, y, height) of the shelf being filled
+
+    def add(self, image, duration):
+        image, pixels = bgra_array(image)
+        digest = hashlib.blake2b(np.ascontiguousarray(pixels).data, digest_size=16).digest()
+        sprite = self.sprites.get(digest)
+        if sprite is None:
+            sprite = self.sprites[digest] = len(self.rects)
+            self.rects.append(self.pack(pixels))
+        if self.frames and self.frames[-1][0] == sprite:
+            self.frames[-1][1] += duration
+        else:
+            self.frames.append([sprite, duration])
+
+    def pack(self, pixels):
+        if self.key is None:
+            self.key = pixels.copy()
+            height, width = pixels.shape[:2]
+            self.width = max(width, min(self.max_size, width * math.ceil(math.sqrt(max(1, self.count)))))
+            self.limit = max(height, self.max_size)
+        top, left, bottom, right = 0, 0, *pixels.shape[:2]
+        if self.trim and pixels.shape == self.key.shape:
+            changed = (pixels != self.key).any(axis=2)
+            rows, cols = np.flatnonzero(changed.any(axis=1)), np.flatnonzero(changed.any(axis=0))
+            if len(rows):
+                top, left, bottom, right = int(rows[0]), int(cols[0]), int(rows[-1]) + 1, int(cols[-1]) + 1
+        h, w = bottom - top, right - left
+
+        x, y, shelf_height = self.shelf or (0, 0, 0)
+        if x + w > self.width:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if self.page is None or y + h > self.limit:
+            self.write_page()
+            self.page = np.zeros((0, self.width, 4), np.uint8)
+            x, y, shelf_height = 0, 0, 0
+        if y + h > self.page.shape[0]:
+            # grown by doubling, the copies add up to less than the final sheet
+            rows = min(self.limit, max(y + h, 2 * self.page.shape[0]))
+            self.page = np.concatenate((self.page, np.zeros((rows - self.page.shape[0], self.width, 4), np.uint8)))
+        self.page[y:y + h, x:x + w] = pixels[top:bottom, left:right]
+        self.height = max(self.height, y + h)
+        self.shelf = (x + w, y, max(shelf_height, h))
+        return (len(self.images), x, y, w, h, left, top)
+
+    def write_page(self):
+        """Write the sheet being filled and let it go."""
+        if self.page is None:
+            return
+        filename = f"{self.name}_{len(self.images) + 1}.{self.fmt}"
+        page = np.ascontiguousarray(self.page[:self.height])
+        image = QImage(page.data, self.width, self.height, self.width * 4, QImage.Format.Format_ARGB32)
+        # quality 100 is lossless for webp, for png it would turn compression off
+        if not image.save(os.path.join(self.folder, filename), self.fmt, 100 if self.fmt == "webp" else -1):
+            raise IOError(f"Can't save {filename}")
+        self.images.append(filename)
+        self.sizes.append({"w": self.width, "h": self.height})
+        self.page, self.height = None, 0
+
+    def save(self, fps=None):
+        """Write the last sheet and `name`.json with the frame map, returns the paths written."""
+        self.write_page()
+        if len(self.images) == 1:
+            # a single sheet isn't numbered
+            os.replace(os.path.join(self.folder, self.images[0]), os.path.join(self.folder, f"{self.name}.{self.fmt}"))
+            self.images = [f"{self.name}.{self.fmt}"]
+
+        height, width = self.key.shape[:2] if self.key is not None else (0, 0)
+        frames = []
+        for sprite, duration in self.frames:
+            page, x, y, w, h, left, top = self.rects[sprite]
+            frame = {
+                "image": page,
+                "frame": {"x": x, "y": y, "w": w, "h": h},
+                "rotated": False,
+                # the box isn't cut from transparent borders, it's a delta over the base frame
+                "trimmed": False,
+                "spriteSourceSize": {"x": left, "y": top, "w": w, "h": h},
+                "sourceSize": {"w": width, "h": height},
+                "duration": duration,
+            }
+            if (w, h) != (width, height):
+                frame["base"] = 0
+            frames.append(frame)
+        meta = {
+            "app": "PyPeek",
+            "image": self.images[0] if self.images else None,
+            "images": self.images,
+            "format": "RGBA8888",
+            "size": self.sizes[0] if self.sizes else {"w": 0, "h": 0},
+            "scale": "1",
+            "fps": fps,
+            "delta": self.trim,  # frames with a "base" are drawn over that frame
+        }
+        with open(os.path.join(self.folder, f"{self.name}.json"), "w") as f:
+            json.dump({"frames": frames, "meta": meta}, f, indent=1)
+        return [os.path.join(self.folder, filename) for filename in self.images + [f"{self.name}.json"]]
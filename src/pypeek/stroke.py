@@ -0,0 +1,44 @@
+import numpy as np
+from PySide6.QtGui import QPainterPath
+
+def simplify(points, tolerance):
+    """Ramer-Douglas-Peucker, keeps the points that deviate more than `tolerance` from the simplified stroke."""
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+
+    xy = np.array([(p.x(), p.y()) for p in points], dtype=np.float64)
+    keep = np.zeros(len(xy), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(xy) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        segment = xy[last] - xy[first]
+        offsets = xy[first + 1:last] - xy[first]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = first + 1 + farthest
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [points[i] for i in np.flatnonzero(keep)]
+
+def stroke_path(points, smooth=False):
+    """Build a path through the points, with `smooth` the corners are rounded with quadratic segments through the midpoints."""
+    path = QPainterPath(points[0])
+    if not smooth or len(points) < 3:
+        for point in points[1:]:
+            path.lineTo(point)
+        return path
+
+    for i in range(1, len(points) - 1):
+        path.quadTo(points[i], (points[i] + points[i + 1]) / 2)
+    path.lineTo(points[-1])
+    return path
@@ -0,0 +1,119 @@
+import os, logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+from PySide6.QtGui import QImage
+
+from .framecache import read_frame
+
+logger = logging.getLogger()
+
+def bgra_array(image):
+    """(image, HxWx4 view of its pixels), converted to 32 bit if needed. The view is only valid while the image is kept."""
+    if image.format() not in (QImage.Format.Format_RGB32, QImage.Format.Format_ARGB32, QImage.Format.Format_ARGB32_Premultiplied):
+        image = image.convertToFormat(QImage.Format.Format_RGB32)
+    pixels = np.frombuffer(image.constBits(), np.uint8).reshape(image.height(), image.bytesPerLine())
+    return image, pixels[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+
+def luma(pixels):
+    """Grayscale float32 of a BGRA array, only ever called on the small search window."""
+    return pixels[..., 2] * np.float32(.299) + pixels[..., 1] * np.float32(.587) + pixels[..., 0] * np.float32(.114)
+
+def _window_sums(values, h, w):
+    # sums of every h x w window, from an integral image
+    integral = np.zeros((values.shape[0] + 1, values.shape[1] + 1), np.float64)
+    integral[1:, 1:] = values.cumsum(0).cumsum(1)
+    return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+def match_template(window, template):
+    """Normalized cross-correlation of `template` at every position inside `window` through FFTs,
+    returns the (y, x) of the best match and its score in [-1, 1]."""
+    h, w = template.shape
+    if window.shape[0] < h or window.shape[1] < w:
+        return None, -1.0
+    t = template - template.mean()
+    t_norm = np.sqrt((t * t).sum())
+    shape = window.shape
+    corr = np.fft.irfft2(np.fft.rfft2(window) * np.conj(np.fft.rfft2(t, shape)), shape)
+    corr = corr[:shape[0] - h + 1, :shape[1] - w + 1]
+    sums = _window_sums(window, h, w)
+    energy = _window_sums(window * window, h, w) - sums * sums / (h * w)
+    # flat windows can't be told apart, they never win
+    score = np.where(energy > 1e-3, corr / (np.sqrt(np.maximum(energy, 1e-3)) * max(t_norm, 1e-3)), -1)
+    y, x = np.unravel_index(np.argmax(score), score.shape)
+    return (int(y), int(x)), float(score[y, x])
+
+def track_scale(width, height, min_size=24):
+    # coarsest native jpeg decoder step that keeps enough of the patch to match
+    scale = 1
+    while scale > 1/8 and min(width, height) * scale / 2 >= min_size:
+        scale /= 2
+    return scale
+
+class RegionTracker(QThread):
+    """Follows an image region from the anchor frame forwards and backwards through the given frames.
+    Emits {frame: (dx, dy)} offsets in image pixels relative to the anchor, frames where the match is lost keep the last position."""
+    progress_signal = Signal(int)
+    tracked_signal = Signal(object)
+
+    def __init__(self, paths, anchor, rect, frame_cache=None, min_score=0.5):
+        super().__init__()
+        self.paths = paths  # {frame: path}
+        self.anchor = anchor
+        self.rect = rect  # QRect in image pixels on the anchor frame
+        self.frame_cache = frame_cache
+        self.min_score = min_score
+        self.chunk_size = 32
+        self.halt = False
+
+    def load(self, frame):
+        path = self.paths[frame]
+        image = self.frame_cache.get((path, self.scale)) if self.frame_cache else None
+        image = read_frame(path, self.scale) if image is None else image
+        return None if image is None else bgra_array(image)
+
+    def run(self):
+        self.scale = track_scale(self.rect.width(), self.rect.height())
+        anchor_image = self.load(self.anchor)
+        if anchor_image is None or anchor_image[0].isNull():
+            self.tracked_signal.emit({})
+            return
+        x, y = round(self.rect.x() * self.scale), round(self.rect.y() * self.scale)
+        w, h = max(4, round(self.rect.width() * self.scale)), max(4, round(self.rect.height() * self.scale))
+        template = luma(anchor_image[1][max(0, y):y + h, max(0, x):x + w])
+        h, w = template.shape
+        margin = max(24, min(w, h))  # how far the patch may move between two frames
+
+        frames = sorted(self.paths)
+        forward = [f for f in frames if f > self.anchor]
+        backward = [f for f in reversed(frames) if f < self.anchor]
+        offsets = {self.anchor: (0.0, 0.0)}
+        done = 0
+        try:
+            with ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as executor:
+                for run in (forward, backward):
+                    px, py = max(0, x), max(0, y)
+                    # frames are decoded ahead on the pool a chunk at a time, matching stays in order
+                    for chunk in range(0, len(run), self.chunk_size):
+                        if self.halt:
+                            return
+                        chunk = run[chunk:chunk + self.chunk_size]
+                        for frame, image in zip(chunk, executor.map(self.load, chunk)):
+                            if image is not None:
+                                top, left = max(0, py - margin), max(0, px - margin)
+                                window = luma(image[1][top:py + h + margin, left:px + w + margin])
+                                match, score = match_template(window, template)
+                                if match and score >= self.min_score:
+                                    py, px = top + match[0], left + match[1]
+                            offsets[frame] = ((px - max(0, x)) / self.scale, (py - max(0, y)) / self.scale)
+                        done += len(chunk)
+                        self.progress_signal.emit(int(done * 100 / len(frames)))
+        except Exception as e:
+            logger.error(e)
+            offsets = {}
+        self.tracked_signal.emit(offsets)
+
+    def stop(self):
+        self.halt = True
+        self.wait()
@@ -1,4 +1,17 @@
-from PySide6.QtWidgets import QWidget
+import time
+from collections import deque
+
+from PySide6.QtWidgets import QGraphicsItem
+
+from .items import frame_range, set_frame_range
+
+def item_cost(item):
+    """Rough memory estimate of a scene item, its device cached pixmap dominates."""
+    rect = item.sceneBoundingRect()
+    cost = 256
+    if item.cacheMode() != QGraphicsItem.CacheMode.NoCache:
+        cost += int(rect.width() * rect.height()) * 4
+    return cost
 
 class Undoable:
     def undo(self):
@@ -7,67 +20,153 @@ class Undoable:
     def redo(self):
         pass
 
+    def cost(self, applied=True):
+        """Memory that only the history keeps alive, while the command is applied or once it was undone."""
+        return 0
+
+    def merge(self, other):
+        """Absorb `other`, pushed right after this command, return True if it was merged."""
+        return False
+
+    def release(self, applied):
+        """Called when the command leaves the history, free whatever only the history kept alive."""
+        pass
+
 class Undo:
-    def __init__(self):
-        self._undo_list = []
-        self._redo_list = []
-        self._limit = 500
+    def __init__(self, limit=500, budget=256 * 1024 * 1024, merge_window=0.0):
+        self._undo_list = deque()  # [undoables, cost] pairs
+        self._redo_list = []  # [undoables, cost] pairs, undone commands keep their items alive too
+        self._limit = limit
+        self._budget = budget
+        self._cost = 0
+        self.merge_window = merge_window  # seconds, successive commands of the same kind pushed within it are merged
+        self._last_push = 0
+        self.on_change = lambda: None
 
     def push(self, *undoables: Undoable):
-        if len(self._undo_list) == self._limit:
-            self._undo_list.pop(0)
-
-        self._undo_list.append(undoables)
         for r in undoables:
             r.redo()
+        self._cost -= sum(cost for _, cost in self._redo_list)
+        self._release([undoable for undoable, _ in self._redo_list], False)
         self._redo_list = []  # The redoable objects must be removed.
 
+        now = time.monotonic()
+        cost = sum(r.cost() for r in undoables)
+        if self._undo_list and now - self._last_push <= self.merge_window and self._merge(self._undo_list[-1], undoables):
+            self._undo_list[-1][1] += cost
+        else:
+            self._undo_list.append([undoables, cost])
+        self._cost += cost
+        self._last_push = now
+        self._evict()
+        self.on_change()
+
     def undo(self):
         if self._undo_list:
-            undoable = self._undo_list.pop()
-            for u in undoable:
+            undoable, cost = self._undo_list.pop()
+            for u in reversed(undoable):
                 u.undo()
-            self._redo_list.append(undoable)
+            redo_cost = sum(u.cost(False) for u in undoable)
+            self._cost += redo_cost - cost
+            self._redo_list.append([undoable, redo_cost])
+            self._last_push = 0
+            self._evict()
+            self.on_change()
             return
         print("No more undo available.")
 
     def redo(self):
         if self._redo_list:
-            undoable = self._redo_list.pop()
+            undoable, redo_cost = self._redo_list.pop()
             for r in undoable:
                 r.redo()
-            self._undo_list.append(undoable)
+            cost = sum(r.cost() for r in undoable)
+            self._undo_list.append([undoable, cost])
+            self._cost += cost - redo_cost
+            self._last_push = 0
+            self._evict()
+            self.on_change()
             return
         print("No more redo available.")
 
     def set_limit(self, limit: int):
         if limit >= 0:
-            i = 0
-            nb = len(self._undo_list) - limit
-            while i < nb:
-                self._undo_list.pop()
-                i += 1
             self._limit = limit
+            self._evict()
+
+    def set_budget(self, budget: int):
+        if budget >= 0:
+            self._budget = budget
+            self._evict()
+
+    def memory(self):
+        return self._cost
+
+    def steps(self):
+        """Number of undo steps in the history."""
+        return len(self._undo_list)
 
     def clear_history(self):
-        self._undo_list = []
+        self._release([undoable for undoable, _ in self._undo_list], True)
+        self._release([undoable for undoable, _ in self._redo_list], False)
+        self._undo_list = deque()
         self._redo_list = []
+        self._cost = 0
+
+    def _merge(self, entry, undoables):
+        last = entry[0]
+        if len(last) != 1 or len(undoables) != 1:
+            return False
+        return last[0].merge(undoables[0])
+
+    def _evict(self):
+        while len(self._undo_list) > self._limit:
+            self._drop_oldest()
+        # over budget, the redo steps furthest away go first, then the oldest undo steps
+        # the next redo and the newest undo are kept even if they alone are over budget
+        while self._cost > self._budget and len(self._redo_list) > 1:
+            undoable, cost = self._redo_list.pop(0)
+            self._cost -= cost
+            self._release([undoable], False)
+        kept = self._redo_list[-1][1] if self._redo_list else 0
+        while self._cost - kept > self._budget and len(self._undo_list) > 1:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        undoable, cost = self._undo_list.popleft()
+        self._cost -= cost
+        self._release([undoable], True)
+
+    def _release(self, undoables_list, applied):
+        for undoable in undoables_list:
+            for u in undoable:
+                u.release(applied)
 
 class AddSceneItemCmd(Undoable):
     def __init__(self, obj, item):
         self.obj = obj
-        self.item = item
+        self.items = [item]
 
     def undo(self):
-        self.item.hide()
-        self.obj.items.remove(self.item)
+        for item in self.items:
+            item.hide()
+            self.obj.items.remove(item)
 
     def redo(self):
-        self.item.show()
-        self.obj.items.append(self.item)
+        for item in self.items:
+            item.show()
+            self.obj.items.append(item)
+
+    def cost(self, applied=True):
+        # an applied add's items are in the scene anyway, dropping the command wouldn't free them
+        return 256 * len(self.items) if applied else sum(item_cost(item) for item in self.items)
 
-    def merge(self, new_item):
-        self.item = new_item
+    def release(self, applied):
+        # an undone add is never shown again, take it out of the scene so it can be freed
+        if not applied:
+            for item in self.items:
+                item.scene() and item.scene().removeItem(item)
+        self.items = []
 
 class ClearSceneCmd(Undoable):
     def __init__(self, obj):
@@ -85,5 +184,86 @@ class ClearSceneCmd(Undoable):
         for item in self.old_items:
             item.hide()
 
-    def merge(self, new_item):
-        self.item = new_item
\ No newline at end of file
+    def cost(self, applied=True):
+        # the cleared items are only kept for the undo
+        return 256 + (sum(item_cost(item) for item in self.old_items) if applied and self.old_items else 0)
+
+    def release(self, applied):
+        # nothing older is left to bring the cleared items back
+        if applied:
+            for item in self.old_items:
+                item.scene() and item.scene().removeItem(item)
+        self.old_items = []
+
+class SetKeyframesCmd(Undoable):
+    def __init__(self, obj, item, keyframes):
+        self.obj = obj
+        self.item = item
+        self.keyframes = keyframes
+        self.old_keyframes = item.keyframes
+
+    def undo(self):
+        self.item.set_keyframes(self.old_keyframes)
+        self.obj.update_item_ranges()
+
+    def redo(self):
+        self.item.set_keyframes(self.keyframes)
+        self.obj.update_item_ranges()
+
+    def cost(self, applied=True):
+        return 64 * (len(self.keyframes) + len(self.old_keyframes))
+
+    def merge(self, other):
+        # nudging a tracked region a few times in a row is one correction
+        if not isinstance(other, SetKeyframesCmd) or other.item is not self.item:
+            return False
+        self.keyframes = other.keyframes
+        return True
+
+class SetFrameRangeCmd(Undoable):
+    def __init__(self, obj, items, first_last):
+        self.obj = obj
+        self.items = items
+        self.first_last = first_last
+        self.old_ranges = [frame_range(item) for item in items]
+
+    def undo(self):
+        for item, first_last in zip(self.items, self.old_ranges):
+            set_frame_range(item, first_last)
+        self.obj.update_item_ranges()
+
+    def redo(self):
+        for item in self.items:
+            set_frame_range(item, self.first_last)
+        self.obj.update_item_ranges()
+
+    def merge(self, other):
+        # setting in and out points back to back is one edit
+        if not isinstance(other, SetFrameRangeCmd) or len(other.items) != len(self.items) or any(a is not b for a, b in zip(self.items, other.items)):
+            return False
+        self.first_last = other.first_last
+        return True
+
+class EditFramesCmd(Undoable):
+    def __init__(self, obj, before, after):
+        self.obj = obj
+        self.before = before  # frame states, see DrawOver.frame_state
+        self.after = after
+
+    def undo(self):
+        self.obj.set_frame_state(self.before)
+
+    def redo(self):
+        self.obj.set_frame_state(self.after)
+
+    def cost(self, applied=True):
+        # manifests are shared with the editor, only the index arrays count
+        return 8 * (len(self.before["manifest"]) + len(self.after["manifest"])) + 256
+
+    def release(self, applied):
+        # annotations whose frames were all deleted can't come back anymore
+        if applied:
+            kept = [item for item, _, _ in self.after["items"]]
+            for item, _, _ in self.before["items"]:
+                if item not in kept and item not in self.obj.items:
+                    item.scene() and item.scene().removeItem(item)
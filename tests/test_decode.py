@@ -0,0 +1,30 @@
+import os, shutil, subprocess, logging
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+pytestmark = pytest.mark.skipif(not shutil.which("ffmpeg") or not shutil.which("ffprobe"), reason="decoding needs ffmpeg")
+
+@pytest.fixture
+def vfr_video(tmp_path):
+    # every 3rd and 7th frame of a 30 fps source, held for one to three ticks with their own timestamps
+    path = str(tmp_path / "vfr.mp4")
+    subprocess.run(["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=160x120:rate=30:duration=12",
+                    "-vf", "select='not(mod(n\\,3))+not(mod(n\\,7))'", "-vsync", "vfr", "-c:v", "mpeg4", path], check=True)
+    return path
+
+def test_segmented_decode_matches_nb_frames(vfr_video, tmp_path):
+    from pypeek import main
+
+    main.logger = logging.getLogger()
+    capturer = main.Capturer()
+    # enough segments that their boundaries fall between frames of different lengths
+    capturer.decode_segments, capturer.min_segment_frames = 4, 20
+    folder = str(tmp_path / "frames")
+    capturer.decode_options = {"image_path": vfr_video, "folder": folder}
+    nb_frames, _ = capturer.get_video_info(vfr_video)
+
+    assert capturer.decode_video() == folder
+    frames = sorted(f for f in os.listdir(folder) if f.endswith(".jpg"))
+    assert frames == [f"peek_{capturer.UID}_{i:06d}.jpg" for i in range(nb_frames)]